@@ -0,0 +1,92 @@
+"""
+Cold-start import cost of the app entry point and each page.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --top 15 --out imports.json --fail-on-heavy
+
+Every target's top-level imports run in a fresh interpreter under
+`python -X importtime`; the report lists the total and the slowest top-level
+packages, and flags heavy modelling libraries loaded before any work happens.
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGETS = ["app.py"] + [
+    f"pages/{p}" for p in sorted(os.listdir(os.path.join(ROOT, "pages")))
+    if p.endswith(".py") and not p.startswith("_")
+]
+
+# libraries that only specific code paths (fits, clustering) should load
+HEAVY = ("sklearn", "statsmodels", "scipy", "prophet", "duckdb")
+
+
+def import_statements(path):
+    """
+    Source of the module-level import statements of a script (without running its body).
+    """
+    with open(path) as f:
+        tree = ast.parse(f.read(), filename=path)
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def measure(source):
+    """
+    Runs `source` in a fresh interpreter with -X importtime.
+    Returns {top-level package: cumulative µs} and the set of every imported module.
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", source],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    top, modules = {}, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue                      # header row
+        modules.add(name.strip())
+        if not name[1:].startswith(" "):  # nesting is shown by extra indentation
+            top[name.strip()] = top.get(name.strip(), 0) + int(cumulative)
+    return top, modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", default=",".join(TARGETS), help="comma-separated scripts, relative to the repo")
+    parser.add_argument("--top", type=int, default=10, help="slowest top-level imports listed per target")
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    parser.add_argument("--fail-on-heavy", action="store_true", help="exit 1 if a target loads a HEAVY library")
+    args = parser.parse_args(argv)
+
+    report, heavy_hits = [], {}
+    for target in args.targets.split(","):
+        top, modules = measure(import_statements(os.path.join(ROOT, target)))
+        heavy = sorted(h for h in HEAVY if h in modules)
+        total_ms = sum(top.values()) / 1000
+        print(f"\n{target}: {total_ms:.0f} ms" + (f"  HEAVY: {', '.join(heavy)}" if heavy else ""))
+        for name, us in sorted(top.items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"  {us / 1000:9.1f} ms  {name}")
+        report.append({
+            "target": target,
+            "total_ms": round(total_ms, 1),
+            "heavy": heavy,
+            "top": [{"module": n, "ms": round(us / 1000, 1)} for n, us in sorted(top.items(), key=lambda kv: -kv[1])],
+        })
+        if heavy:
+            heavy_hits[target] = heavy
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if heavy_hits and args.fail_on_heavy else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
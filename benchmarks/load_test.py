@@ -0,0 +1,256 @@
+"""
+Concurrent multi-session load test of app.py and the pages.
+
+    python -m benchmarks.load_test --sessions 20 --dealers 1000
+    python -m benchmarks.load_test --sessions 40 --iterations 5 --out load.json
+
+Each session is a Streamlit AppTest driven through a scripted interaction
+(switching dealers, dragging the cluster slider, changing the forecast horizon,
+re-weighting the health score). Sessions run concurrently in threads of one
+process, sharing caches like sessions of one server. Reported per page and
+action: rerun latency p50/p95/p99, plus the process RSS growth per session.
+Datasets come from benchmarks.run.dataset; derived tables are precomputed first,
+as the background worker would.
+
+Limitations of the AppTest harness:
+  - AppTest reruns the whole script on every widget change, so actions that a real
+    server serves as an st.fragment rerun (FRAGMENT_ACTIONS: reweight, drag_k,
+    horizon) are measured as full-page reruns. Their latencies are upper bounds,
+    not the fragment path; the report flags those rows.
+  - Concurrent sessions need share_test_runtime(), which patches AppTest's private
+    `app_test.Runtime` reference so all sessions share one mock Runtime. It may
+    break with a Streamlit upgrade, and it does not model the server's session
+    manager, websocket or forward-message traffic.
+Drive a real `streamlit run` server (e.g. with a browser-automation tool) to
+measure fragment latency as users see it.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.run import ROOT, dataset
+
+PAGES = ["app.py", "pages/01_dashboard.py", "pages/02_account_explorer.py",
+         "pages/03_segmentation.py", "pages/04_forecast.py"]
+
+
+# ===================
+# INTERACTION SCRIPTS
+# ===================
+
+def _pick(widget, rng):
+    options = [o for o in widget.options if o != widget.value] or widget.options
+    widget.set_value(rng.choice(options))
+
+
+def _reweight(at, rng):
+    at.slider(key="weight_s").set_value(rng.choice([0.1, 0.35, 0.6, 0.9]))
+
+
+def _switch_dealer(at, rng):
+    _pick(at.selectbox[0], rng)
+
+
+def _drag_k(at, rng):
+    at.slider[0].set_value(rng.randint(2, 6))
+
+
+def _horizon(at, rng):
+    at.slider[0].set_value(rng.randint(1, 12))
+
+
+def _fast_method(at, rng):
+    at.selectbox[1].set_value(rng.choice(["Holt-Winters (fast)", "Seasonal naive (fast)", "Drift (fast)"]))
+
+
+# page -> [(action name, widget change)] replayed --iterations times after the first render
+SCRIPTS = {
+    "app.py": [("rerun", lambda at, rng: None)],
+    "pages/01_dashboard.py": [("reweight", _reweight), ("rerun", lambda at, rng: None)],
+    "pages/02_account_explorer.py": [("switch_dealer", _switch_dealer)],
+    "pages/03_segmentation.py": [("drag_k", _drag_k)],
+    "pages/04_forecast.py": [("horizon", _horizon), ("switch_dealer", _switch_dealer),
+                             ("fast_method", _fast_method)],
+}
+
+# actions a real server reruns as an st.fragment; AppTest measures them as full reruns
+FRAGMENT_ACTIONS = {
+    ("pages/01_dashboard.py", "reweight"),
+    ("pages/03_segmentation.py", "drag_k"),
+    ("pages/04_forecast.py", "horizon"),
+}
+
+
+# ===================
+# MEASUREMENT
+# ===================
+
+def rss_mb():
+    """
+    Current resident set size of this process (Linux /proc; falls back to the peak).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval, self.peak = interval, rss_mb()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, rss_mb())
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        return max(self.peak, rss_mb())
+
+
+def share_test_runtime():
+    """
+    AppTest installs a mock Runtime singleton for each run and clears it when the run
+    ends, which breaks other sessions still running in parallel threads. Route those
+    assignments through a shim that keeps the latest mock installed instead. This
+    patches AppTest's private `app_test.Runtime` name, and every session then shares
+    one mock Runtime.
+    """
+    from streamlit.runtime.runtime import Runtime
+    from streamlit.testing.v1 import app_test
+
+    class KeepInstance(type):
+        def __setattr__(cls, name, value):
+            if name != "_instance":
+                super().__setattr__(name, value)
+            elif value is not None:
+                Runtime._instance = value
+
+    app_test.Runtime = KeepInstance("Runtime", (Runtime,), {})
+
+
+def run_session(page, iterations, seed, timeout):
+    """
+    One simulated user on `page`; returns [(page, action, seconds, error)].
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=timeout)
+    samples = []
+
+    def rerun(action):
+        start = time.perf_counter()
+        at.run()
+        error = str(at.exception[0].value) if at.exception else None
+        samples.append((page, action, time.perf_counter() - start, error))
+
+    rerun("open")
+    for _ in range(iterations):
+        for action, change in SCRIPTS[page]:
+            change(at, rng)
+            rerun(action)
+    return samples
+
+
+def summarize(samples):
+    groups = {}
+    for page, action, seconds, _ in samples:
+        groups.setdefault((page, action), []).append(seconds)
+        groups.setdefault((page, "*"), []).append(seconds)
+        groups.setdefault(("*", "*"), []).append(seconds)
+    rows = []
+    for (page, action), values in sorted(groups.items()):
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        rows.append({"page": page, "action": action, "reruns": len(values),
+                     "p50": p50, "p95": p95, "p99": p99, "max": max(values),
+                     "full_rerun_of_fragment": (page, action) in FRAGMENT_ACTIONS})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent simulated users")
+    parser.add_argument("--iterations", type=int, default=3, help="times each session replays its script")
+    parser.add_argument("--pages", default=",".join(PAGES), help="pages the sessions are spread over (round-robin)")
+    parser.add_argument("--dealers", type=int, default=50, help="dealer count of the generated dataset")
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache-dir", default=os.path.join(tempfile.gettempdir(), "kam-bench"))
+    parser.add_argument("--precompute", default="cube,features,health_history,segments,hierarchy,forecast",
+                        help="derived tables published before the run (empty: pages build them)")
+    parser.add_argument("--workers", type=int, default=None, help="processes for the forecast precompute")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds allowed per rerun")
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    warnings.simplefilter("ignore")
+    os.environ["KAM_DATA_DIR"] = dataset(args.dealers, args.months, args.seed, args.cache_dir)
+    os.environ["KAM_PRECOMPUTE_THREAD"] = "0"    # published below, as the worker would
+
+    from models.pipeline import run_pipeline
+    if args.precompute:
+        run_pipeline(steps=tuple(args.precompute.split(",")), workers=args.workers)
+
+    share_test_runtime()
+    pages = args.pages.split(",")
+    for page in pages:      # warm the shared caches once, as after the first user
+        run_session(page, 0, args.seed, args.timeout)
+
+    base = rss_mb()
+    sampler = RssSampler()
+    sampler.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        futures = [
+            pool.submit(run_session, pages[i % len(pages)], args.iterations, args.seed + i, args.timeout)
+            for i in range(args.sessions)
+        ]
+        samples = [s for f in futures for s in f.result()]
+    wall = time.perf_counter() - start
+    peak = sampler.stop()
+
+    rows = summarize(samples)
+    errors = [s for s in samples if s[3]]
+    print(f"\n{args.sessions} sessions x {args.iterations} iterations on {args.dealers} dealers: "
+          f"{len(samples)} reruns in {wall:.1f}s, {len(errors)} errors")
+    print(f"{'page':<30} {'action':<14} {'n':>5} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} {'max s':>8}")
+    for r in rows:
+        print(f"{r['page']:<30} {r['action']:<14} {r['reruns']:>5} "
+              f"{r['p50']:>8.3f} {r['p95']:>8.3f} {r['p99']:>8.3f} {r['max']:>8.3f}"
+              f"{'  [full]' if r['full_rerun_of_fragment'] else ''}")
+    print("[full]: a fragment rerun on a real server, measured here as a full-page rerun "
+          "(AppTest reruns the whole script); an upper bound for the fragment path.")
+    per_session = (peak - base) / args.sessions
+    print(f"\nRSS: {base:.0f} MB warm, {peak:.0f} MB peak, {per_session:.1f} MB per session")
+    for page, action, _, error in errors[:5]:
+        print(f"error on {page} [{action}]: {error}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({
+                "sessions": args.sessions, "iterations": args.iterations, "dealers": args.dealers,
+                "wall_seconds": wall, "rss_warm_mb": base, "rss_peak_mb": peak,
+                "rss_per_session_mb": per_session, "errors": len(errors), "latency": rows,
+                "harness": "streamlit AppTest, full-script reruns, one shared mock Runtime",
+            }, f, indent=2)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
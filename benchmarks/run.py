@@ -0,0 +1,231 @@
+"""
+Benchmarks the model and page pipelines on generated datasets of several sizes.
+
+    python -m benchmarks.run --scales 50,1000,10000 --out bench.json
+    python -m benchmarks.run --scales 50,1000 --save-baseline
+    python -m benchmarks.run --scales 50,1000 --baseline benchmarks/baseline.json
+
+Each step is timed (best of --repeat runs) and then run once more under
+tracemalloc for its peak Python allocation. Datasets are generated once with
+data/generate_mock_data.generate_scaled and reused from --cache-dir.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+
+def _load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def dataset(n_dealers, months, seed, cache_dir):
+    """
+    Folder with the six CSVs for this scale, generated on first use.
+    """
+    folder = os.path.join(cache_dir, f"d{n_dealers}_m{months}_s{seed}")
+    if not os.path.exists(os.path.join(folder, "dealer_master.csv")):
+        gen = _load_module("generate_mock_data", os.path.join(ROOT, "data", "generate_mock_data.py"))
+        gen.generate_scaled(n_dealers, months, seed=seed, out_dir=folder)
+    return folder
+
+
+def measure(fn, repeat):
+    """
+    Returns (result, best wall seconds, peak traced MB).
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak / 2**20
+
+
+def _rows(obj):
+    if isinstance(obj, tuple):
+        return sum(_rows(o) for o in obj)
+    return len(obj) if hasattr(obj, "__len__") else None
+
+
+def run_scale(n_dealers, args):
+    folder = dataset(n_dealers, args.months, args.seed, args.cache_dir)
+    os.environ["KAM_DATA_DIR"] = folder
+    os.environ["KAM_PRECOMPUTE_THREAD"] = "0"    # no background builds during the timings
+
+    from utils import data_plane, data_store
+    from models import model_store
+    from models.churn_model import compute_churn
+    from models.dealer_features import build_dealer_features
+    from models.forecast_model import batch_forecast, fast_forecast
+    from models.health_backends import BACKENDS, check_parity, snapshot_health_components
+    from models.health_score import compute_health_score
+    from models.sentiment_model import dealer_sentiment, enrich_sentiment
+
+    results = []
+
+    def step(name, fn, rows_in=None):
+        out, seconds, peak_mb = measure(fn, args.repeat)
+        results.append({
+            "scale": n_dealers, "step": name, "seconds": round(seconds, 6),
+            "peak_mb": round(peak_mb, 3), "rows_in": rows_in, "rows_out": _rows(out),
+        })
+        print(f"  {name:<40} {seconds:10.4f}s {peak_mb:10.1f} MB", flush=True)
+        return out
+
+    print(f"scale={n_dealers} dealers ({folder})")
+
+    def cold_snapshot():
+        shutil.rmtree(data_store.snapshot_dir(), ignore_errors=True)
+        return data_store.refresh_snapshot()
+
+    step("snapshot_build", cold_snapshot)
+    version = data_store.data_version()
+
+    step("load_data[shared,cold]", lambda: data_plane.shared_tables.__wrapped__(version))
+    step("load_data[shared,rerun]", lambda: data_plane.load_data(version))
+
+    dealer, sales, inv, claims, crm, feedback = data_store.load_tables()
+    n_in = len(sales) + len(claims) + len(crm) + len(inv)
+
+    step("compute_health_score", lambda: compute_health_score(sales, claims, crm, inv), n_in)
+    step("compute_churn", lambda: compute_churn(sales, claims, crm, inv), n_in)
+    for backend in BACKENDS:
+        step(f"health_components[{backend},snapshot]", lambda b=backend: snapshot_health_components(b), n_in)
+    for backend in BACKENDS[1:]:
+        check_parity(backend=backend)   # every backend must reproduce the pandas health score
+    enriched = step("enrich_sentiment", lambda: enrich_sentiment(feedback), len(feedback))
+    step("dealer_sentiment", lambda: dealer_sentiment(enriched), len(enriched))
+    features = step("dealer_features",
+                    lambda: build_dealer_features(sales, claims, crm, inv, feedback),
+                    n_in + len(feedback))
+
+    from models.segmentation import K_RANGE, feature_matrix, fit_segments, segment_frame
+    X = feature_matrix(segment_frame(dealer, sales, features))
+    step("segmentation_fit[all k]", lambda: fit_segments(X, K_RANGE), len(X))
+
+    forecast_page = _load_module("page_04_forecast", os.path.join(ROOT, "pages", "04_forecast.py"))
+    dealer_id = dealer["dealer_id"].iloc[0]
+
+    def cold_sarimax():
+        model_store._RESULTS.clear()
+        shutil.rmtree(model_store.store_dir(), ignore_errors=True)
+        return forecast_page.build_forecast(sales, dealer_id, 3)
+
+    step("build_forecast[sarimax,1 dealer]", cold_sarimax, len(sales))
+    step("build_forecast[holt_winters,1 dealer]",
+         lambda: forecast_page.build_forecast(sales, dealer_id, 3, method="holt_winters"), len(sales))
+    step("fast_forecast[holt_winters,all]", lambda: fast_forecast(sales, method="holt_winters"), len(sales))
+    if n_dealers <= args.batch_forecast_max:
+        def cold_batch():
+            model_store._RESULTS.clear()
+            shutil.rmtree(model_store.store_dir(), ignore_errors=True)
+            return batch_forecast(sales, workers=args.workers)
+        step("batch_forecast[sarimax,all]", cold_batch, len(sales))
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Prints current vs baseline per step. Returns (steps slower than baseline × (1 + tolerance),
+    baseline steps this run did not produce at the scales it ran); both mean the check failed.
+    Steps without a baseline are listed as new: the baseline needs --save-baseline.
+    """
+    base = {(r["scale"], r["step"]): r for r in baseline["results"]}
+    ran = {(r["scale"], r["step"]) for r in results}
+    scales = {scale for scale, _ in ran}
+    missing = sorted(key for key in base if key[0] in scales and key not in ran)
+    regressions = []
+    print(f"\n{'scale':>7} {'step':<40} {'base s':>10} {'now s':>10} {'ratio':>7}")
+    for r in results:
+        b = base.get((r["scale"], r["step"]))
+        if b is None:
+            print(f"{r['scale']:>7} {r['step']:<40} {'-':>10} {r['seconds']:>10.4f} {'':>7}  NEW (no baseline)")
+            continue
+        if not b["seconds"]:
+            continue
+        ratio = r["seconds"] / b["seconds"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  SLOWER"
+            regressions.append(r)
+        print(f"{r['scale']:>7} {r['step']:<40} {b['seconds']:>10.4f} {r['seconds']:>10.4f} {ratio:>7.2f}{flag}")
+    for scale, name in missing:
+        print(f"{scale:>7} {name:<40} {base[(scale, name)]['seconds']:>10.4f} {'-':>10} {'':>7}  MISSING (renamed or removed?)")
+    return regressions, missing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="50,1000", help="comma-separated dealer counts, e.g. 50,1000,10000,100000")
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None, help="processes for the batch forecast step")
+    parser.add_argument("--batch-forecast-max", type=int, default=50,
+                        help="largest scale that runs the full SARIMAX batch forecast")
+    parser.add_argument("--cache-dir", default=os.path.join(tempfile.gettempdir(), "kam-bench"))
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite --baseline with these results")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    warnings.simplefilter("ignore")   # statsmodels/streamlit noise on tiny or bare runs
+    results = []
+    for scale in [int(s) for s in args.scales.split(",")]:
+        results.extend(run_scale(scale, args))
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "months": args.months,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions, missing = compare(results, json.load(f), args.tolerance)
+        if (regressions or missing) and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
+import argparse
 import os
 import numpy as np
 import pandas as pd
@@ -8,29 +9,67 @@ np.random.seed(42)
 random.seed(42)
 
 
+REGIONS = ["North", "South", "East", "West", "Central"]
+STATES = ["Delhi", "Maharashtra", "Karnataka", "Gujarat", "Tamil Nadu", "Uttar Pradesh"]
+CITIES = ["Delhi", "Mumbai", "Bengaluru", "Ahmedabad", "Chennai", "Lucknow", "Pune", "Jaipur"]
+TIERS = ["T1", "T2", "T3"]
+OWNERSHIP_TYPES = ["Franchise", "Company Owned", "Partner"]
+
+MODELS = ["Hatch-A", "Sedan-Z", "SUV-X", "MPV-Y", "EV-E1"]
+BASE_VOLUME = {
+    "Hatch-A": 30,
+    "Sedan-Z": 20,
+    "SUV-X": 15,
+    "MPV-Y": 10,
+    "EV-E1": 5
+}
+TIER_FACTOR = {"T1": 1.3, "T2": 1.0, "T3": 0.7}
+
+ISSUE_TYPES = ["Engine", "AC", "Brakes", "Electrical", "Body", "Other"]
+SEVERITIES = [1, 2, 3]  # 3 = high
+
+INTERACTION_TYPES = ["Call", "Dealer Visit", "Video Call", "Email", "Review Meeting"]
+NOTES_TEMPLATES = [
+    "Discussed sales performance and incentives.",
+    "Reviewed service quality and customer feedback.",
+    "Talked about EV potential in the region.",
+    "Aligned on quarterly targets and marketing support.",
+    "Addressed complaints related to warranty delays."
+]
+
+FEEDBACK_SOURCES = ["Annual Review", "Survey", "Ad-hoc Call", "Review Meeting"]
+POSITIVE_COMMENTS = [
+    "Inventory allocation is good.",
+    "Satisfied with marketing support.",
+    "Product quality is appreciated.",
+    "Timely delivery of vehicles."
+]
+NEGATIVE_COMMENTS = [
+    "Warranty delays affecting trust.",
+    "Marketing support is insufficient.",
+    "Training for staff is needed.",
+    "More EV models required.",
+    "Price discounting pressure in region."
+]
+
+
 def ensure_data_dir():
     os.makedirs("data", exist_ok=True)
 
 
 def generate_dealer_master(n_dealers=50):
-    regions = ["North", "South", "East", "West", "Central"]
-    states = ["Delhi", "Maharashtra", "Karnataka", "Gujarat", "Tamil Nadu", "Uttar Pradesh"]
-    cities = ["Delhi", "Mumbai", "Bengaluru", "Ahmedabad", "Chennai", "Lucknow", "Pune", "Jaipur"]
-    tiers = ["T1", "T2", "T3"]
-    ownership_types = ["Franchise", "Company Owned", "Partner"]
-
     rows = []
     for i in range(1, n_dealers + 1):
         dealer_id = f"D{i:03d}"
         rows.append({
             "dealer_id": dealer_id,
             "dealer_name": f"Dealer_{dealer_id}",
-            "region": random.choice(regions),
-            "state": random.choice(states),
-            "city": random.choice(cities),
-            "tier": random.choice(tiers),
+            "region": random.choice(REGIONS),
+            "state": random.choice(STATES),
+            "city": random.choice(CITIES),
+            "tier": random.choice(TIERS),
             "years_partnered": np.random.randint(1, 15),
-            "ownership_type": random.choice(ownership_types)
+            "ownership_type": random.choice(OWNERSHIP_TYPES)
         })
 
     df = pd.DataFrame(rows)
@@ -39,25 +78,17 @@ def generate_dealer_master(n_dealers=50):
 
 
 def generate_sales_transactions(dealers, start_month="2024-01-01", n_months=12):
-    models = ["Hatch-A", "Sedan-Z", "SUV-X", "MPV-Y", "EV-E1"]
-    base_volume = {
-        "Hatch-A": 30,
-        "Sedan-Z": 20,
-        "SUV-X": 15,
-        "MPV-Y": 10,
-        "EV-E1": 5
-    }
-
     start_date = datetime.strptime(start_month, "%Y-%m-%d")
+    tiers = dict(zip(dealers["dealer_id"], dealers["tier"]))
     rows = []
     for m in range(n_months):
         month_date = start_date + pd.DateOffset(months=m)
         for dealer_id in dealers["dealer_id"]:
-            for model in models:
+            for model in MODELS:
                 # volume with randomness, higher for T1/T2
-                tier = dealers.loc[dealers["dealer_id"] == dealer_id, "tier"].values[0]
-                tier_factor = {"T1": 1.3, "T2": 1.0, "T3": 0.7}[tier]
-                units = max(0, int(np.random.normal(base_volume[model] * tier_factor, 5)))
+                tier = tiers[dealer_id]
+                tier_factor = TIER_FACTOR[tier]
+                units = max(0, int(np.random.normal(BASE_VOLUME[model] * tier_factor, 5)))
                 if units == 0:
                     continue
                 wholesale_value = units * np.random.randint(500000, 1200000) / 10  # per unit approx
@@ -76,7 +107,7 @@ def generate_sales_transactions(dealers, start_month="2024-01-01", n_months=12):
 
 def generate_inventory_stock(dealers, models=None):
     if models is None:
-        models = ["Hatch-A", "Sedan-Z", "SUV-X", "MPV-Y", "EV-E1"]
+        models = MODELS
 
     rows = []
     for dealer_id in dealers["dealer_id"]:
@@ -98,8 +129,6 @@ def generate_inventory_stock(dealers, models=None):
 def generate_warranty_claims(dealers, sales_df, avg_claim_rate=0.03):
     rows = []
     claim_id_counter = 1
-    issue_types = ["Engine", "AC", "Brakes", "Electrical", "Body", "Other"]
-    severities = [1, 2, 3]  # 3 = high
 
     # Approximate number of claims based on sales volume
     total_sales = sales_df["units_sold"].sum()
@@ -117,8 +146,8 @@ def generate_warranty_claims(dealers, sales_df, avg_claim_rate=0.03):
             "dealer_id": dealer_id,
             "claim_id": f"C{claim_id_counter:05d}",
             "model": model,
-            "issue_type": random.choice(issue_types),
-            "severity": random.choice(severities),
+            "issue_type": random.choice(ISSUE_TYPES),
+            "severity": random.choice(SEVERITIES),
             "filed_date": filed_date.strftime("%Y-%m-%d"),
             "resolution_days": resolution_days
         })
@@ -130,15 +159,6 @@ def generate_warranty_claims(dealers, sales_df, avg_claim_rate=0.03):
 
 
 def generate_crm_engagement(dealers, start_date="2024-01-01", end_date="2024-12-31"):
-    interaction_types = ["Call", "Dealer Visit", "Video Call", "Email", "Review Meeting"]
-    notes_templates = [
-        "Discussed sales performance and incentives.",
-        "Reviewed service quality and customer feedback.",
-        "Talked about EV potential in the region.",
-        "Aligned on quarterly targets and marketing support.",
-        "Addressed complaints related to warranty delays."
-    ]
-
     start = datetime.strptime(start_date, "%Y-%m-%d")
     end = datetime.strptime(end_date, "%Y-%m-%d")
     delta_days = (end - start).days
@@ -151,8 +171,8 @@ def generate_crm_engagement(dealers, start_date="2024-01-01", end_date="2024-12-
             rows.append({
                 "dealer_id": dealer_id,
                 "date": date.strftime("%Y-%m-%d"),
-                "interaction_type": random.choice(interaction_types),
-                "notes": random.choice(notes_templates),
+                "interaction_type": random.choice(INTERACTION_TYPES),
+                "notes": random.choice(NOTES_TEMPLATES),
                 "duration_mins": np.random.randint(10, 90)
             })
 
@@ -162,35 +182,20 @@ def generate_crm_engagement(dealers, start_date="2024-01-01", end_date="2024-12-
 
 
 def generate_feedback_forms(dealers):
-    feedback_sources = ["Annual Review", "Survey", "Ad-hoc Call", "Review Meeting"]
-    positive_comments = [
-        "Inventory allocation is good.",
-        "Satisfied with marketing support.",
-        "Product quality is appreciated.",
-        "Timely delivery of vehicles."
-    ]
-    negative_comments = [
-        "Warranty delays affecting trust.",
-        "Marketing support is insufficient.",
-        "Training for staff is needed.",
-        "More EV models required.",
-        "Price discounting pressure in region."
-    ]
-
     rows = []
     for dealer_id in dealers["dealer_id"]:
         n_feedbacks = np.random.randint(1, 5)
         for _ in range(n_feedbacks):
             date = datetime(2024, np.random.randint(1, 13), np.random.randint(1, 28))
             if np.random.rand() < 0.6:
-                comment = random.choice(positive_comments)
+                comment = random.choice(POSITIVE_COMMENTS)
             else:
-                comment = random.choice(negative_comments)
+                comment = random.choice(NEGATIVE_COMMENTS)
 
             rows.append({
                 "dealer_id": dealer_id,
                 "feedback_date": date.strftime("%Y-%m-%d"),
-                "feedback_source": random.choice(feedback_sources),
+                "feedback_source": random.choice(FEEDBACK_SOURCES),
                 "sentiment": "",  # to be filled by sentiment model later
                 "comments": comment
             })
@@ -200,12 +205,172 @@ def generate_feedback_forms(dealers):
     return df
 
 
+# ===================
+# SCALE MODE
+# ===================
+# Same tables and distributions as above, drawn with vectorized NumPy per block of
+# dealers and appended to the CSVs, so memory stays bounded by the block size.
+
+def _append_csv(df, path, first):
+    df.to_csv(path, mode="w" if first else "a", header=first, index=False)
+
+
+def scaled_dealer_master(n_dealers, rng):
+    width = max(3, len(str(n_dealers)))
+    ids = "D" + pd.Series(np.arange(1, n_dealers + 1)).astype(str).str.zfill(width)
+    return pd.DataFrame({
+        "dealer_id": ids,
+        "dealer_name": "Dealer_" + ids,
+        "region": rng.choice(REGIONS, n_dealers),
+        "state": rng.choice(STATES, n_dealers),
+        "city": rng.choice(CITIES, n_dealers),
+        "tier": rng.choice(TIERS, n_dealers),
+        "years_partnered": rng.integers(1, 15, n_dealers),
+        "ownership_type": rng.choice(OWNERSHIP_TYPES, n_dealers),
+    })
+
+
+def scaled_sales(dealers, months, rng):
+    """
+    One row per dealer × month × model with non-zero units (months: datetime64[D] array).
+    """
+    n_d, n_m, n_models = len(dealers), len(months), len(MODELS)
+    tier_factor = dealers["tier"].map(TIER_FACTOR).to_numpy()
+    base = np.array([BASE_VOLUME[m] for m in MODELS])
+
+    mean = tier_factor[:, None, None] * base[None, None, :]
+    units = np.maximum(0, rng.normal(mean, 5, size=(n_d, n_m, n_models))).astype(np.int64)
+    d_idx, m_idx, model_idx = np.nonzero(units)
+    units = units[d_idx, m_idx, model_idx]
+    wholesale_value = units * rng.integers(500000, 1200000, size=len(units)) / 10
+
+    return pd.DataFrame({
+        "date": months[m_idx],
+        "dealer_id": dealers["dealer_id"].to_numpy()[d_idx],
+        "model": np.array(MODELS)[model_idx],
+        "units_sold": units,
+        "wholesale_value": np.round(wholesale_value, 2),
+    })
+
+
+def scaled_inventory(dealers, rng):
+    n = len(dealers) * len(MODELS)
+    return pd.DataFrame({
+        "dealer_id": np.repeat(dealers["dealer_id"].to_numpy(), len(MODELS)),
+        "model": np.tile(MODELS, len(dealers)),
+        "stock_units": np.maximum(0, rng.normal(20, 8, n)).astype(np.int64),
+        "ageing_days": np.maximum(0, rng.normal(30, 15, n)).astype(np.int64),
+    })
+
+
+def scaled_claims(sales, claim_rate, first_claim_id, rng):
+    """
+    Claims drawn uniformly over sale rows, total ≈ units × claim_rate (as the original).
+    """
+    n = int(sales["units_sold"].sum() * claim_rate)
+    src = rng.integers(0, len(sales), n) if len(sales) else np.zeros(0, dtype=np.int64)
+    filed = sales["date"].to_numpy()[src] + rng.integers(5, 120, n).astype("timedelta64[D]")
+    return pd.DataFrame({
+        "dealer_id": sales["dealer_id"].to_numpy()[src],
+        "claim_id": "C" + pd.Series(np.arange(first_claim_id, first_claim_id + n)).astype(str).str.zfill(5),
+        "model": sales["model"].to_numpy()[src],
+        "issue_type": rng.choice(ISSUE_TYPES, n),
+        "severity": rng.choice(SEVERITIES, n),
+        "filed_date": filed,
+        "resolution_days": np.maximum(1, rng.normal(7, 3, n)).astype(np.int64),
+    })
+
+
+def scaled_crm(dealers, start, end, rng):
+    counts = rng.integers(5, 25, len(dealers))
+    n = counts.sum()
+    span = (end - start).astype(int)
+    return pd.DataFrame({
+        "dealer_id": np.repeat(dealers["dealer_id"].to_numpy(), counts),
+        "date": start + rng.integers(0, span + 1, n).astype("timedelta64[D]"),
+        "interaction_type": rng.choice(INTERACTION_TYPES, n),
+        "notes": rng.choice(NOTES_TEMPLATES, n),
+        "duration_mins": rng.integers(10, 90, n),
+    })
+
+
+def scaled_feedback(dealers, months, rng):
+    counts = rng.integers(1, 5, len(dealers))
+    n = counts.sum()
+    positive = rng.random(n) < 0.6
+    comments = np.where(positive, rng.choice(POSITIVE_COMMENTS, n), rng.choice(NEGATIVE_COMMENTS, n))
+    dates = months[rng.integers(0, len(months), n)] + rng.integers(0, 27, n).astype("timedelta64[D]")
+    return pd.DataFrame({
+        "dealer_id": np.repeat(dealers["dealer_id"].to_numpy(), counts),
+        "feedback_date": dates,
+        "feedback_source": rng.choice(FEEDBACK_SOURCES, n),
+        "sentiment": "",
+        "comments": comments,
+    })
+
+
+def generate_scaled(n_dealers=50, n_months=12, claim_rate=0.03, seed=42,
+                    out_dir="data", end_month="2024-12", chunk_dealers=2000):
+    """
+    Writes all six CSVs for n_dealers × n_months ending at end_month into out_dir.
+    Large tables are generated and appended one block of chunk_dealers at a time.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    path = lambda name: os.path.join(out_dir, name)
+
+    first_month = pd.Period(end_month, freq="M") - (n_months - 1)
+    months = pd.period_range(first_month, periods=n_months, freq="M").to_timestamp().to_numpy().astype("datetime64[D]")
+    crm_start = months[0]
+    crm_end = (pd.Period(end_month, freq="M").end_time.normalize()).to_datetime64().astype("datetime64[D]")
+
+    dealers = scaled_dealer_master(n_dealers, rng)
+    dealers.to_csv(path("dealer_master.csv"), index=False)
+
+    next_claim_id = 1
+    for start in range(0, n_dealers, chunk_dealers):
+        block = dealers.iloc[start:start + chunk_dealers]
+        first = start == 0
+
+        sales = scaled_sales(block, months, rng)
+        _append_csv(sales, path("sales_transactions.csv"), first)
+
+        claims = scaled_claims(sales, claim_rate, next_claim_id, rng)
+        next_claim_id += len(claims)
+        _append_csv(claims, path("warranty_claims.csv"), first)
+
+        _append_csv(scaled_inventory(block, rng), path("inventory_stock.csv"), first)
+        _append_csv(scaled_crm(block, crm_start, crm_end, rng), path("crm_engagement.csv"), first)
+        _append_csv(scaled_feedback(block, months, rng), path("feedback_forms.csv"), first)
+
+    return dealers
+
+
 if __name__ == "__main__":
-    ensure_data_dir()
-    dealers = generate_dealer_master(n_dealers=50)
-    sales = generate_sales_transactions(dealers)
-    inventory = generate_inventory_stock(dealers)
-    claims = generate_warranty_claims(dealers, sales)
-    crm = generate_crm_engagement(dealers)
-    feedback = generate_feedback_forms(dealers)
-    print("Mock data generated in /data directory.")
+    parser = argparse.ArgumentParser(description="Generate mock KAM data.")
+    parser.add_argument("--scale", action="store_true",
+                        help="vectorized, chunked generator for load testing")
+    parser.add_argument("--dealers", type=int, default=50)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--claim-rate", type=float, default=0.03)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="data", help="output folder (scale mode)")
+    parser.add_argument("--chunk-dealers", type=int, default=2000,
+                        help="dealers generated per block (scale mode)")
+    args = parser.parse_args()
+
+    if args.scale:
+        generate_scaled(args.dealers, args.months, args.claim_rate, args.seed,
+                        out_dir=args.out, chunk_dealers=args.chunk_dealers)
+        print(f"Mock data for {args.dealers} dealers × {args.months} months generated in {args.out}.")
+    else:
+        np.random.seed(args.seed)
+        random.seed(args.seed)
+        ensure_data_dir()
+        dealers = generate_dealer_master(n_dealers=args.dealers)
+        sales = generate_sales_transactions(dealers, n_months=args.months)
+        inventory = generate_inventory_stock(dealers)
+        claims = generate_warranty_claims(dealers, sales, avg_claim_rate=args.claim_rate)
+        crm = generate_crm_engagement(dealers)
+        feedback = generate_feedback_forms(dealers)
+        print("Mock data generated in /data directory.")
@@ -0,0 +1,95 @@
+"""
+Headless nightly scoring: health, churn, sentiment and SARIMAX forecasts for the
+whole portfolio, written as Parquet with a run manifest. No Streamlit needed.
+
+    python -m models.batch_score --workers 8 --out /srv/kam/nightly
+"""
+import argparse
+import os
+import platform
+import time
+from datetime import datetime, timezone
+
+from utils.data_store import TABLES, dump_json, load_tables, refresh_snapshot, write_atomic
+from utils.paths import data_dir as default_data_dir
+from .churn_model import compute_churn
+from .forecast_model import MAX_HORIZON, batch_forecast
+from .health_backends import BACKENDS, HEALTH_BACKEND, snapshot_health_score
+from .sentiment_model import dealer_sentiment, enrich_sentiment
+
+MANIFEST = "manifest.json"
+
+
+def run_batch(out_dir, data_dir=None, workers=None, periods=MAX_HORIZON, forecast=True,
+              health_backend=HEALTH_BACKEND, log=print):
+    """
+    Runs the scoring pipeline and writes <table>.parquet files plus manifest.json to out_dir.
+    The manifest is written last, so its presence marks a complete run.
+    Returns the manifest.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    started = datetime.now(timezone.utc)
+    steps, outputs = [], {}
+
+    def step(name, fn, rows_in=None, rows=len):
+        start = time.perf_counter()
+        out = fn()
+        seconds = time.perf_counter() - start
+        steps.append({"step": name, "seconds": round(seconds, 4), "rows_in": rows_in, "rows_out": rows(out)})
+        if log:
+            log(f"{name:<18} {seconds:9.2f}s {rows(out):>10} rows")
+        return out
+
+    # one snapshot for the whole run: the data version and the sources come from it
+    snapshot = step("snapshot", lambda: refresh_snapshot(data_dir), rows=lambda m: len(m["tables"]))
+    sales, inv, claims, crm, feedback = load_tables(("sales", "inv", "claims", "crm", "feedback"), data_dir)
+    n_in = len(sales) + len(claims) + len(crm) + len(inv)
+
+    outputs["health"] = step("health", lambda: snapshot_health_score(health_backend, data_dir), n_in)
+    outputs["churn"] = step("churn", lambda: compute_churn(sales, claims, crm, inv, health=outputs["health"]),
+                            len(outputs["health"]))
+    enriched = step("sentiment", lambda: enrich_sentiment(feedback), len(feedback))
+    outputs["sentiment"] = enriched
+    outputs["dealer_sentiment"] = step("dealer_sentiment", lambda: dealer_sentiment(enriched), len(enriched))
+    if forecast:
+        outputs["forecast"] = step("forecast", lambda: batch_forecast(sales, periods, workers, data_dir),
+                                   len(sales))
+
+    files = {}
+    for name, df in outputs.items():
+        path = os.path.join(out_dir, f"{name}.parquet")
+        write_atomic(path, lambda p, df=df: df.to_parquet(p, index=False))
+        files[name] = {"file": os.path.basename(path), "rows": len(df), "columns": list(df.columns)}
+
+    manifest = {
+        "data_version": snapshot["version"],
+        "sources": {name: {"file": TABLES[name], "sha256": snapshot["tables"][name]["sha256"]} for name in TABLES},
+        "data_dir": os.path.abspath(data_dir or default_data_dir()),
+        "started": started.isoformat(timespec="seconds"),
+        "finished": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "workers": workers or os.cpu_count(),
+        "periods": periods if forecast else None,
+        "health_backend": health_backend,
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "steps": steps,
+        "tables": files,
+    }
+    write_atomic(os.path.join(out_dir, MANIFEST), lambda p: dump_json(manifest, p))
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="output folder for the Parquet tables and manifest.json")
+    parser.add_argument("--data-dir", default=None, help="source CSV folder (default: data/ or $KAM_DATA_DIR)")
+    parser.add_argument("--workers", type=int, default=None, help="forecast processes (default: all cores)")
+    parser.add_argument("--periods", type=int, default=MAX_HORIZON, help="forecast horizon in months")
+    parser.add_argument("--no-forecast", action="store_true", help="skip the SARIMAX forecasts")
+    parser.add_argument("--health-backend", choices=BACKENDS, default=HEALTH_BACKEND,
+                        help="health aggregation backend (default: $KAM_HEALTH_BACKEND or pandas)")
+    args = parser.parse_args()
+
+    manifest = run_batch(args.out, args.data_dir, args.workers, args.periods, forecast=not args.no_forecast,
+                         health_backend=args.health_backend)
+    print(f"data version {manifest['data_version']}: {len(manifest['tables'])} tables written to {args.out}")
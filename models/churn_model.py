@@ -1,17 +1,33 @@
 import pandas as pd
+
+from utils.perf import timed
 from .health_score import compute_health_score
 
+RISK_BINS = [-0.01, 0.33, 0.66, 1.1]
+RISK_LABELS = ["Low", "Medium", "High"]
+
 
-def compute_churn(sales, claims, crm, inv):
-    health = compute_health_score(sales, claims, crm, inv)
+def churn_from_health(health):
+    """
+    Churn probability and risk bucket derived from an existing health score frame.
+    """
     df = health.copy()
 
     df["churn_prob"] = 1 - (df["health_score"] / 100)
 
     df["risk_bucket"] = pd.cut(
         df["churn_prob"],
-        bins=[-0.01, 0.33, 0.66, 1.1],
-        labels=["Low", "Medium", "High"]
+        bins=RISK_BINS,
+        labels=RISK_LABELS
     )
 
+    return df
+
+
+@timed("compute_churn")
+def compute_churn(sales, claims, crm, inv, health=None):
+    if health is None:
+        health = compute_health_score(sales, claims, crm, inv)
+    df = churn_from_health(health)
+
     return df[["dealer_id", "churn_prob", "risk_bucket"]]
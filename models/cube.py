@@ -0,0 +1,94 @@
+import pandas as pd
+
+# model label of the CRM rows: interactions are per dealer, not per model
+DEALER_LEVEL = "(dealer)"
+
+MEASURES = ["sales_rows", "units_sold", "wholesale_value", "claims", "crm_contacts"]
+
+
+def _month(dates):
+    month = dates.to_numpy().astype("datetime64[M]").astype("datetime64[ns]")
+    return pd.Series(month, index=dates.index, name="month")
+
+
+def build_cube(sales, claims, crm):
+    """
+    Dealer × model × month cube: sales_rows, units_sold, wholesale_value, claims,
+    claims_sev_<level> per severity level and crm_contacts (on the DEALER_LEVEL model row).
+    Every measure is additive, so any roll-up is a groupby-sum over the cube.
+    """
+    keys = ["dealer_id", "model", "month"]
+
+    parts = [
+        sales.groupby([sales["dealer_id"], sales["model"], _month(sales["date"])], observed=True).agg(
+            sales_rows=("units_sold", "size"),
+            units_sold=("units_sold", "sum"),
+            wholesale_value=("wholesale_value", "sum"),
+        )
+    ]
+    if not claims.empty:
+        by_sev = claims.groupby(
+            [claims["dealer_id"], claims["model"], _month(claims["filed_date"]), claims["severity"]],
+            observed=True,
+        ).size().unstack(fill_value=0)
+        by_sev.columns = [f"claims_sev_{level}" for level in by_sev.columns]
+        by_sev.insert(0, "claims", by_sev.sum(axis=1))
+        parts.append(by_sev)
+    if not crm.empty:
+        contacts = crm.groupby([crm["dealer_id"], _month(crm["date"])], observed=True).size()
+        contacts = contacts.rename("crm_contacts").to_frame()
+        contacts["model"] = DEALER_LEVEL
+        parts.append(contacts.set_index("model", append=True).reorder_levels(keys))
+
+    cube = pd.concat(parts, axis=1).fillna(0)
+    for col in MEASURES:
+        if col not in cube:
+            cube[col] = 0
+    ints = [c for c in cube.columns if c != "wholesale_value"]
+    cube[ints] = cube[ints].astype("int64")
+    cube.index.names = keys
+    cube = cube.sort_index().reset_index()
+    cube["model"] = cube["model"].astype("category")    # sales models plus DEALER_LEVEL
+    return cube
+
+
+# ===================
+# ROLL-UPS
+# ===================
+
+def monthly_sales(cube):
+    """
+    The sales rows of the cube in the shape of the sales table at month grain
+    (dealer_id, model, date = month start, units_sold, wholesale_value). Monthly
+    resamples and sums over it equal those over the raw transactions.
+    """
+    df = cube.loc[cube["sales_rows"] > 0, ["dealer_id", "model", "month", "units_sold", "wholesale_value"]]
+    return df.rename(columns={"month": "date"}).reset_index(drop=True)
+
+
+def dealer_units(cube):
+    """
+    dealer_id, units_sold summed over all time for every dealer with sales.
+    """
+    df = cube[cube["sales_rows"] > 0]
+    return df.groupby("dealer_id", observed=True)["units_sold"].sum().reset_index()
+
+
+def oem_monthly_units(cube):
+    """
+    month, units summed across all dealers, for the months with sales.
+    """
+    df = cube[cube["sales_rows"] > 0]
+    return df.groupby("month")["units_sold"].sum().rename("units").reset_index()
+
+
+def claims_by_severity(cube):
+    """
+    severity, claims counted over the whole portfolio.
+    """
+    cols = [c for c in cube.columns if c.startswith("claims_sev_")]
+    totals = cube[cols].sum()
+    return pd.DataFrame({
+        "severity": [int(c.rsplit("_", 1)[1]) for c in cols],
+        "claims": totals.to_numpy(),
+    })
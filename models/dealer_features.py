@@ -0,0 +1,17 @@
+from .health_score import health_components, score_health
+from .churn_model import churn_from_health
+from .sentiment_model import enrich_sentiment, dealer_sentiment
+
+
+def build_dealer_features(sales, claims, crm, inv, feedback, components=None):
+    """
+    One row per dealer with the raw health components (trend, severity, contacts, age),
+    their normalized s/e/c/a, health, churn and average sentiment.
+    `components` are precomputed health components (e.g. from another health backend).
+    """
+    if components is None:
+        components = health_components(sales, claims, crm, inv)
+    df = churn_from_health(score_health(components))
+    sent = dealer_sentiment(enrich_sentiment(feedback))
+    return df.merge(sent, on="dealer_id", how="outer")
+
@@ -1,15 +1,291 @@
-from statsmodels.tsa.statespace.sarimax import SARIMAX
+import argparse
+import functools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-def forecast_model(data, periods=3):
+import numpy as np
+import pandas as pd
+
+from utils.perf import timed
+from .model_store import evict_store, fit_sarimax
+
+MIN_HISTORY = 6     # months of history required before a series is forecast
+MAX_HORIZON = 12    # batch runs forecast this far so any page horizon is a slice
+
+FORECAST_COLUMNS = ["dealer_id", "model", "step", "month", "forecast_units"]
+
+FAST_METHODS = ("seasonal_naive", "drift", "holt_winters")
+SEASON = 12
+HW_ALPHA, HW_BETA, HW_GAMMA = 0.3, 0.1, 0.1   # fixed Holt-Winters smoothing constants
+
+
+def forecast_model(data, periods=3, dealer_id=None, model_name=None):
     """
     Seasonal ARIMA forecast for one time series
     """
-    model = SARIMAX(
+    results = fit_sarimax(
         data,
+        dealer_id=dealer_id,
+        model_name=model_name,
         order=(1,1,1),            # ARIMA(p,d,q)
         seasonal_order=(1,1,1,12) # annual seasonality
     )
-    results = model.fit(disp=False)
     forecast = results.forecast(periods)
     return forecast
 
+
+@timed("forecast_ts")
+def forecast_ts(series, periods=3, dealer_id=None, model_name=None, data_dir=None):
+    """
+    Train a SARIMA model on past dealer/model sales.
+    Fits come from the model store, so a new horizon only re-runs forecast().
+    """
+    results = fit_sarimax(
+        series,
+        dealer_id=dealer_id,
+        model_name=model_name,
+        order=(1,1,1),
+        seasonal_order=(1,1,1,12),  # yearly seasonality
+        data_dir=data_dir,
+        enforce_stationarity=False,
+        enforce_invertibility=False,
+    )
+    return results.forecast(periods)
+
+
+def monthly_series(sales):
+    """
+    Yields (dealer_id, model, monthly units series) for every dealer×model pair.
+    """
+    df = sales[["dealer_id", "model", "date", "units_sold"]]
+    for (dealer_id, model_name), grp in df.groupby(["dealer_id", "model"], sort=True, observed=True):
+        ts = grp.set_index("date")["units_sold"].resample("M").sum()
+        yield dealer_id, model_name, ts
+
+
+def _forecast_rows(task, data_dir=None):
+    dealer_id, model_name, ts, periods = task
+    fc = forecast_ts(ts, periods=periods, dealer_id=dealer_id, model_name=model_name, data_dir=data_dir)
+    return [
+        (dealer_id, model_name, i + 1,
+         (ts.index[-1] + pd.DateOffset(months=i + 1)).strftime("%Y-%m"), float(val))
+        for i, val in enumerate(fc)
+    ]
+
+
+def batch_forecast(sales, periods=MAX_HORIZON, workers=None, data_dir=None):
+    """
+    Forecasts every dealer×model series across a process pool; fits go to the model
+    store of `data_dir`.
+    Series shorter than MIN_HISTORY months are skipped, as in the page.
+    Returns one long table: dealer_id, model, step, month, forecast_units.
+    """
+    tasks = [
+        (dealer_id, model_name, ts, periods)
+        for dealer_id, model_name, ts in monthly_series(sales)
+        if len(ts) >= MIN_HISTORY
+    ]
+    if not tasks:
+        return pd.DataFrame(columns=FORECAST_COLUMNS)
+
+    return pd.DataFrame(_run_tasks(tasks, workers, data_dir), columns=FORECAST_COLUMNS)
+
+
+def _run_tasks(tasks, workers=None, data_dir=None):
+    workers = workers or os.cpu_count() or 1
+    forecast_rows = functools.partial(_forecast_rows, data_dir=data_dir)
+    if workers == 1:
+        chunks = map(forecast_rows, tasks)
+        return [row for chunk in chunks for row in chunk]
+    chunksize = max(1, len(tasks) // (workers * 4))
+    # forking from a non-main thread (the in-app precompute worker) can copy a lock
+    # another thread holds into the child and deadlock it: spawn fresh interpreters there
+    context = None
+    if threading.current_thread() is not threading.main_thread():
+        context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        rows = [row for chunk in pool.map(forecast_rows, tasks, chunksize=chunksize)
+                for row in chunk]
+    evict_store(data_dir=data_dir)   # the workers rarely reach EVICT_EVERY saves each
+    return rows
+
+
+# ===================
+# FAST (VECTORIZED) ENGINE
+# ===================
+
+def series_matrix(sales):
+    """
+    Dense matrix of monthly units, one row per dealer×model series.
+    Returns (keys frame with dealer_id/model, PeriodIndex of months, matrix, months of history).
+    Months are the global range, so every series is zero-padded before its first and
+    after its last sale; the fast methods skip the leading padding (see _fast).
+    """
+    month = sales["date"].dt.to_period("M")
+    monthly = sales.groupby(["dealer_id", "model", month], observed=True)["units_sold"].sum()
+    wide = monthly.unstack(fill_value=0)
+    months = pd.period_range(wide.columns.min(), wide.columns.max(), freq="M")
+    wide = wide.reindex(columns=months, fill_value=0)
+
+    # history = months from a series' first to its last sale, as resample() would produce
+    first = monthly.reset_index(level=2)["date"].groupby(level=[0, 1], observed=True).agg(["min", "max"])
+    first = first.reindex(wide.index)
+    history = np.array([(b - a).n + 1 for a, b in zip(first["min"], first["max"])])
+
+    keys = wide.index.to_frame(index=False)
+    return keys, months, wide.to_numpy(dtype="float64"), history
+
+
+def seasonal_naive(y, periods, season=SEASON):
+    """
+    Repeats the last observed season; falls back to the last value for short history.
+    """
+    n, t = y.shape
+    if t < season:
+        return np.repeat(y[:, -1:], periods, axis=1)
+    return y[:, t - season + (np.arange(periods) % season)]
+
+
+def drift(y, periods):
+    """
+    Last value plus the average month-on-month change over the whole history.
+    """
+    n, t = y.shape
+    slope = (y[:, -1] - y[:, 0]) / max(t - 1, 1)
+    return y[:, -1:] + slope[:, None] * np.arange(1, periods + 1)
+
+
+def holt_winters(y, periods, season=SEASON, alpha=HW_ALPHA, beta=HW_BETA, gamma=HW_GAMMA):
+    """
+    Additive Holt-Winters run on all series at once (one array update per month).
+    Without two full seasons of history it reduces to Holt's linear trend.
+    """
+    n, t = y.shape
+    seasonal = t >= 2 * season
+    if seasonal:
+        level = y[:, :season].mean(axis=1)
+        trend = (y[:, season:2 * season].mean(axis=1) - level) / season
+        seas = y[:, :season] - level[:, None]
+        start = season
+    else:
+        level = y[:, 0].copy()
+        trend = (y[:, -1] - y[:, 0]) / max(t - 1, 1) if t > 1 else np.zeros(n)
+        seas = np.zeros((n, season))
+        start = 1
+
+    for i in range(start, t):
+        s = seas[:, i % season]
+        prev_level = level
+        level = alpha * (y[:, i] - s) + (1 - alpha) * (level + trend)
+        trend = beta * (level - prev_level) + (1 - beta) * trend
+        if seasonal:
+            seas[:, i % season] = gamma * (y[:, i] - level) + (1 - gamma) * s
+
+    steps = np.arange(1, periods + 1)
+    season_idx = (t + steps - 1) % season
+    return level[:, None] + trend[:, None] * steps + seas[:, season_idx]
+
+
+def _fast(y, periods, method):
+    """
+    Runs `method` on every row of y from its first non-zero month: the zero padding
+    before a series launched is not history. Rows starting in the same month are
+    forecast together, so this is one vectorized pass per distinct start month.
+    """
+    if method == "seasonal_naive":
+        fn = seasonal_naive
+    elif method == "drift":
+        fn = drift
+    elif method == "holt_winters":
+        fn = holt_winters
+    else:
+        raise ValueError(f"Unknown forecast method: {method}")
+
+    first = (y > 0).argmax(axis=1)
+    fc = np.empty((len(y), periods))
+    for start in np.unique(first):
+        rows = first == start
+        fc[rows] = fn(y[rows, start:], periods)
+    return np.clip(fc, 0, None)
+
+
+def fast_forecast(sales, periods=MAX_HORIZON, method="holt_winters"):
+    """
+    Forecasts every dealer×model series with one of FAST_METHODS in a few array operations.
+    Same long format and MIN_HISTORY guard as batch_forecast.
+    """
+    keys, months, y, history = series_matrix(sales)
+    keep = history >= MIN_HISTORY
+    if not keep.any():
+        return pd.DataFrame(columns=FORECAST_COLUMNS)
+    keys, y = keys[keep], y[keep]
+    fc = _fast(y, periods, method)
+
+    future = pd.period_range(months[-1] + 1, periods=periods, freq="M").strftime("%Y-%m")
+    n = len(keys)
+    return pd.DataFrame({
+        "dealer_id": np.repeat(keys["dealer_id"].to_numpy(), periods),
+        "model": np.repeat(keys["model"].to_numpy(), periods),
+        "step": np.tile(np.arange(1, periods + 1), n),
+        "month": np.tile(np.asarray(future), n),
+        "forecast_units": fc.ravel(),
+    })
+
+
+def backtest(sales, holdout=3, methods=("sarimax",) + FAST_METHODS, workers=None, data_dir=None):
+    """
+    Holds out the last `holdout` months of every series and scores each method on them.
+    Returns one row per method: series, MAE, WAPE and wall time.
+    """
+    keys, months, y, history = series_matrix(sales)
+    keep = history - holdout >= MIN_HISTORY
+    keys, y = keys[keep].reset_index(drop=True), y[keep]
+    train, actual = y[:, :-holdout], y[:, -holdout:]
+    index = months[:-holdout].to_timestamp(how="end").normalize()
+
+    results = []
+    for method in methods:
+        start = time.perf_counter()
+        if method == "sarimax":
+            first = (train > 0).argmax(axis=1)   # drop the zero padding before a series starts
+            tasks = [
+                (f"backtest:{d}", m, pd.Series(train[i, first[i]:], index=index[first[i]:]), holdout)
+                for i, (d, m) in enumerate(zip(keys["dealer_id"], keys["model"]))
+            ]
+            rows = _run_tasks(tasks, workers, data_dir) if tasks else []
+            fc = np.array([r[4] for r in rows]).reshape(len(tasks), holdout)
+        else:
+            fc = _fast(train, holdout, method)
+        seconds = time.perf_counter() - start
+
+        err = np.abs(fc - actual)
+        results.append({
+            "method": method,
+            "series": len(keys),
+            "mae": float(err.mean()) if err.size else np.nan,
+            "wape": float(err.sum() / max(actual.sum(), 1)),
+            "seconds": seconds,
+        })
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    from utils.data_store import data_version, load_tables, save_derived
+
+    parser = argparse.ArgumentParser(description="Forecast every dealer×model series.")
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    parser.add_argument("--periods", type=int, default=MAX_HORIZON)
+    parser.add_argument("--backtest", type=int, metavar="MONTHS", default=None,
+                        help="compare SARIMAX with the fast methods on the last MONTHS instead")
+    args = parser.parse_args()
+
+    (sales,) = load_tables(("sales",))
+    if args.backtest:
+        print(backtest(sales, holdout=args.backtest, workers=args.workers).to_string(index=False))
+        raise SystemExit
+    table = batch_forecast(sales, periods=args.periods, workers=args.workers)
+    path = save_derived("forecast", table, data_version())
+    print(f"{len(table)} forecast rows written to {path}")
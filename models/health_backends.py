@@ -0,0 +1,132 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.data_store import load_tables, refresh_snapshot, snapshot_dir
+from .health_score import health_components, score_health
+from .health_stream import streaming_health_components
+
+BACKENDS = ("pandas", "duckdb", "stream")
+
+# backend of the precompute pipeline's health components (KAM_HEALTH_BACKEND=duckdb|stream)
+HEALTH_BACKEND = os.environ.get("KAM_HEALTH_BACKEND", "pandas")
+
+COMPONENT_COLUMNS = ["dealer_id", "trend", "severity", "count", "contacts", "avg_duration", "age", "stock"]
+
+# Same aggregation as health_components, as one statement. Window frames are by
+# row (not calendar month), matching pandas' rolling(3)/shift(3) on the monthly rows.
+HEALTH_SQL = """
+WITH monthly AS (
+    SELECT dealer_id, date_trunc('month', date) AS month, SUM(units_sold) AS units
+    FROM sales
+    GROUP BY 1, 2
+), rolled AS (
+    SELECT dealer_id, month,
+           SUM(units) OVER (PARTITION BY dealer_id ORDER BY month
+                            ROWS BETWEEN 2 PRECEDING AND CURRENT ROW) AS rolling3
+    FROM monthly
+), lagged AS (
+    SELECT dealer_id, rolling3,
+           LAG(rolling3, 3) OVER (PARTITION BY dealer_id ORDER BY month) AS prev3,
+           ROW_NUMBER() OVER (PARTITION BY dealer_id ORDER BY month DESC) AS rn
+    FROM rolled
+), trend AS (
+    SELECT dealer_id, (rolling3 - prev3) / NULLIF(prev3, 0) AS trend
+    FROM lagged
+    WHERE rn = 1
+), claims_agg AS (
+    SELECT dealer_id, AVG(severity) AS severity, COUNT(claim_id) AS count
+    FROM claims
+    GROUP BY 1
+), crm_agg AS (
+    SELECT dealer_id, COUNT(interaction_type) AS contacts, AVG(duration_mins) AS avg_duration
+    FROM crm
+    WHERE date >= (SELECT MAX(date) FROM crm) - INTERVAL 90 DAY
+    GROUP BY 1
+), inv_agg AS (
+    SELECT dealer_id, AVG(ageing_days) AS age, AVG(stock_units) AS stock
+    FROM inv
+    GROUP BY 1
+)
+SELECT t.dealer_id,
+       COALESCE(t.trend, 0) AS trend,
+       COALESCE(c.severity, 0) AS severity,
+       COALESCE(c.count, 0) AS count,
+       COALESCE(e.contacts, 0) AS contacts,
+       COALESCE(e.avg_duration, 0) AS avg_duration,
+       COALESCE(i.age, 0) AS age,
+       COALESCE(i.stock, 0) AS stock
+FROM trend t
+LEFT JOIN claims_agg c USING (dealer_id)
+LEFT JOIN crm_agg e USING (dealer_id)
+LEFT JOIN inv_agg i USING (dealer_id)
+ORDER BY t.dealer_id
+"""
+
+
+def duckdb_health_components(data_dir=None, threads=None):
+    """
+    health_components computed by DuckDB directly on the Feather snapshot.
+    The files are scanned as Arrow datasets, so only the referenced columns are read
+    and the CRM date filter is pushed into the scan; aggregation runs on all cores.
+    """
+    import duckdb
+    import pyarrow.dataset as ds
+
+    refresh_snapshot(data_dir)
+    folder = snapshot_dir(data_dir)
+    con = duckdb.connect()
+    if threads:
+        con.execute(f"SET threads = {int(threads)}")
+    for name in ("sales", "claims", "crm", "inv"):
+        con.register(name, ds.dataset(os.path.join(folder, f"{name}.feather"), format="feather"))
+    df = con.execute(HEALTH_SQL).df()
+    con.close()
+    return df[COMPONENT_COLUMNS]
+
+
+def snapshot_health_components(backend="pandas", data_dir=None):
+    """
+    Raw health components using the chosen aggregation backend
+    ("stream" reads the source CSVs in chunks instead of the snapshot).
+    """
+    if backend == "duckdb":
+        return duckdb_health_components(data_dir)
+    if backend == "stream":
+        return streaming_health_components(data_dir)[COMPONENT_COLUMNS]
+    if backend == "pandas":
+        sales, inv, claims, crm = load_tables(("sales", "inv", "claims", "crm"), data_dir=data_dir)
+        return health_components(sales, claims, crm, inv)[COMPONENT_COLUMNS]
+    raise ValueError(f"Unknown health backend: {backend}")
+
+
+def snapshot_health_score(backend="pandas", data_dir=None):
+    df = score_health(snapshot_health_components(backend, data_dir))
+    return df[["dealer_id", "health_score", "health_bucket"]]
+
+
+def check_parity(data_dir=None, backend="duckdb", rtol=1e-9):
+    """
+    Raises AssertionError unless `backend` gives the pandas health components and scores.
+    Explicit raises rather than assert statements, so the check also runs under python -O.
+    """
+    expected = score_health(snapshot_health_components("pandas", data_dir))
+    actual = score_health(snapshot_health_components(backend, data_dir))
+
+    if list(expected["dealer_id"]) != list(actual["dealer_id"]):
+        raise AssertionError(f"{backend}: dealer sets differ from pandas")
+    for col in COMPONENT_COLUMNS[1:] + ["health_score"]:
+        np.testing.assert_allclose(
+            actual[col].to_numpy(dtype="float64"), expected[col].to_numpy(dtype="float64"),
+            rtol=rtol, atol=1e-12, err_msg=f"{backend}: {col}",
+        )
+    pd.testing.assert_series_equal(
+        actual["health_bucket"].reset_index(drop=True), expected["health_bucket"].reset_index(drop=True)
+    )
+
+
+if __name__ == "__main__":
+    for name in BACKENDS[1:]:
+        check_parity(backend=name)
+        print(f"{name} backend matches pandas health_components")
@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+from .health_score import CRM_WINDOW_DAYS, HEALTH_WEIGHTS
+
+DAY = np.timedelta64(1, "D")
+
+
+def _normalize_columns(x, mask):
+    """
+    Column-wise (per month) version of health_score.normalize over the dealers in `mask`.
+    """
+    x = np.where(mask, x, np.nan)
+    with np.errstate(all="ignore"):
+        lo = np.nanmin(np.where(mask, x, np.inf), axis=0)
+        hi = np.nanmax(np.where(mask, x, -np.inf), axis=0)
+        span = hi - lo
+        out = np.where(span > 0, (x - lo) / np.where(span > 0, span, 1), 0.5)
+    return np.where(mask, out, np.nan)
+
+
+def _trend_matrix(units, present):
+    """
+    Trend at every month, using each dealer's monthly rows up to that month exactly as
+    sales_trend does: rolling3 over the last three rows vs the rolling3 three rows earlier.
+    """
+    n, t = units.shape
+    rank = np.cumsum(present, axis=1) - 1          # index of the latest row at each month
+
+    # compress each dealer's rows to the left: rows[d, k] = units of its k-th row
+    r, c = np.nonzero(present)
+    rows = np.zeros((n, t))
+    rows[r, rank[r, c]] = units[r, c]
+    csum = np.hstack([np.zeros((n, 1)), np.cumsum(rows, axis=1)])
+
+    k = np.arange(t)
+    rolling3 = csum[:, k + 1] - csum[:, np.maximum(k - 2, 0)]
+    prev3 = np.full((n, t), np.nan)
+    prev3[:, 3:] = rolling3[:, :-3]
+    with np.errstate(all="ignore"):
+        trend_rows = (rolling3 - prev3) / np.where(prev3 == 0, np.nan, prev3)
+
+    trend = np.take_along_axis(trend_rows, np.maximum(rank, 0), axis=1)
+    return np.where(rank >= 0, trend, np.nan), rank >= 0
+
+
+def _crm_contacts(crm, dealer_pos, month_starts):
+    """
+    Contacts per dealer in the CRM_WINDOW_DAYS before the newest CRM date of each month's
+    cutoff (end of month), i.e. the ENGAGEMENT window of health_components per cutoff.
+    """
+    n, t = len(dealer_pos), len(month_starts) - 1
+    dates = crm["date"].to_numpy().astype("datetime64[D]")
+    ends = month_starts[1:]                                   # exclusive cutoffs
+    if len(dates) == 0:
+        return np.zeros((n, t))
+
+    ordered = np.sort(dates)
+    last = np.searchsorted(ordered, ends, side="left") - 1
+    newest = np.where(last >= 0, ordered[np.maximum(last, 0)], ends)
+    starts = newest - CRM_WINDOW_DAYS * DAY
+    starts = np.where(last >= 0, starts, ends)                # no CRM yet -> empty window
+
+    bounds = np.unique(np.concatenate([starts, ends]))
+    pos = dealer_pos.get_indexer(crm["dealer_id"])
+    keep = pos >= 0
+    bins = np.searchsorted(bounds, dates[keep], side="right")
+    hist = np.zeros((n, len(bounds) + 1))
+    np.add.at(hist, (pos[keep], bins), 1)
+    before = np.cumsum(hist, axis=1)                          # before[:, j]: dates < bounds[j]
+
+    return before[:, np.searchsorted(bounds, ends)] - before[:, np.searchsorted(bounds, starts)]
+
+
+def health_history(sales, claims, crm, inv):
+    """
+    Health score and churn probability for every dealer at the end of every month,
+    computed in one vectorized pass over dealer × month matrices.
+    Month m uses the data up to its end: the trend from the dealer's monthly rows,
+    all claims filed so far and the CRM window before the newest interaction; inventory
+    has no history, so the current ageing is used throughout.
+    The last month equals compute_health_score on the full data.
+    Returns a long frame: dealer_id, month, health_score, churn_prob.
+    """
+    def month_ordinal(dates):
+        return dates.to_numpy().astype("datetime64[M]").astype("int64")
+
+    sales_m = month_ordinal(sales["date"])
+    first = sales_m.min()
+    last = max(
+        sales_m.max(),
+        month_ordinal(claims["filed_date"]).max() if not claims.empty else first,
+        month_ordinal(crm["date"]).max() if not crm.empty else first,
+    )
+    months = np.arange(first, last + 1).astype("datetime64[M]")
+    month_starts = np.arange(first, last + 2).astype("datetime64[M]").astype("datetime64[D]")
+    dealers = pd.Index(np.sort(sales["dealer_id"].unique()))
+    n, t = len(dealers), len(months)
+
+    def month_pos(dates):
+        return np.clip(month_ordinal(dates) - first, 0, t - 1)
+
+    # sales trend
+    d = dealers.get_indexer(sales["dealer_id"])
+    m = month_pos(sales["date"])
+    units = np.zeros((n, t))
+    np.add.at(units, (d, m), sales["units_sold"].to_numpy(dtype="float64"))
+    present = np.zeros((n, t), dtype=bool)
+    present[d, m] = True
+    trend, active = _trend_matrix(units, present)
+
+    # claims filed so far
+    sev_sum, sev_n = np.zeros((n, t)), np.zeros((n, t))
+    if not claims.empty:
+        d = dealers.get_indexer(claims["dealer_id"])
+        keep = (d >= 0) & claims["severity"].notna().to_numpy()
+        m = month_pos(claims["filed_date"])
+        np.add.at(sev_sum, (d[keep], m[keep]), claims["severity"].to_numpy(dtype="float64")[keep])
+        np.add.at(sev_n, (d[keep], m[keep]), 1)
+    with np.errstate(all="ignore"):
+        severity = np.cumsum(sev_sum, axis=1) / np.cumsum(sev_n, axis=1)
+
+    contacts = _crm_contacts(crm, dealers, month_starts)
+
+    age = inv.groupby("dealer_id", observed=True)["ageing_days"].mean().reindex(dealers).to_numpy(dtype="float64")
+    age = np.repeat(age[:, None], t, axis=1)
+
+    # fillna(0) then normalize per month, as in health_components / score_health
+    comps = {
+        "s": _normalize_columns(np.nan_to_num(trend), active),
+        "e": _normalize_columns(np.nan_to_num(contacts), active),
+        "c": 1 - _normalize_columns(np.nan_to_num(severity), active),
+        "a": 1 - _normalize_columns(np.nan_to_num(age), active),
+    }
+    health = sum(HEALTH_WEIGHTS[key] * comps[key] for key in HEALTH_WEIGHTS) * 100
+
+    r, c = np.nonzero(active)
+    return pd.DataFrame({
+        "dealer_id": dealers[r],
+        "month": months[c].astype("datetime64[ns]"),
+        "health_score": health[r, c],
+        "churn_prob": 1 - health[r, c] / 100,
+    })
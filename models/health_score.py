@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 
+from utils.perf import timed
+
 
 def normalize(series):
     if series.isna().all():
@@ -11,25 +13,64 @@ def normalize(series):
     return (series - min_v) / (max_v - min_v)
 
 
-def compute_health_score(sales, claims, crm, inv):
-    # ===================
-    # SALES TREND
-    # ===================
-    sales["date"] = pd.to_datetime(sales["date"])
-    sales["month"] = sales["date"].dt.to_period("M")
-    monthly = sales.groupby(["dealer_id", "month"])["units_sold"].sum().reset_index()
+CRM_WINDOW_DAYS = 90
+
+# weights of the normalized components: sales trend, engagement, claims, inventory age
+HEALTH_WEIGHTS = {"s": 0.35, "e": 0.25, "c": 0.20, "a": 0.20}
+HEALTH_BINS = [-1, 40, 70, 200]
+HEALTH_LABELS = ["High Risk", "Watchlist", "Healthy"]
+
+
+def sales_trend(monthly):
+    """
+    Latest rolling-3-month vs previous-3-month trend per dealer.
+    `monthly` has one row per dealer_id × month with units_sold.
+    """
     monthly = monthly.sort_values(["dealer_id", "month"])
 
-    monthly["rolling3"] = monthly.groupby("dealer_id")["units_sold"].rolling(3, min_periods=1).sum().reset_index(level=0, drop=True)
-    monthly["prev3"] = monthly.groupby("dealer_id")["rolling3"].shift(3)
+    monthly["rolling3"] = monthly.groupby("dealer_id", observed=True)["units_sold"].rolling(3, min_periods=1).sum().reset_index(level=0, drop=True)
+    monthly["prev3"] = monthly.groupby("dealer_id", observed=True)["rolling3"].shift(3)
     monthly["trend"] = (monthly["rolling3"] - monthly["prev3"]) / (monthly["prev3"].replace(0, np.nan))
-    trend_df = monthly.groupby("dealer_id").tail(1)[["dealer_id", "trend"]]
+    return monthly.groupby("dealer_id", observed=True).tail(1)[["dealer_id", "trend"]]
+
+
+def inventory_components(inv):
+    return inv.groupby("dealer_id", observed=True).agg(
+        age=("ageing_days", "mean"),
+        stock=("stock_units", "mean")
+    ).reset_index()
+
+
+def combine_components(trend_df, claims_agg, crm_agg, inv_agg):
+    """
+    Left-joins the per-dealer aggregates onto the dealers with sales; missing -> 0.
+    """
+    df = trend_df.merge(claims_agg, on="dealer_id", how="left") \
+                 .merge(crm_agg, on="dealer_id", how="left") \
+                 .merge(inv_agg, on="dealer_id", how="left")
+
+    values = df.columns.drop("dealer_id")     # the categorical key has no 0 category
+    df[values] = df[values].fillna(0)
+    return df
+
+
+def health_components(sales, claims, crm, inv):
+    """
+    Per-dealer raw aggregates (trend, severity, contacts, age, ...) behind the health score.
+    The input frames are not modified.
+    """
+    # ===================
+    # SALES TREND
+    # ===================
+    month = pd.to_datetime(sales["date"]).dt.to_period("M").rename("month")
+    monthly = sales.groupby([sales["dealer_id"], month], observed=True)["units_sold"].sum().reset_index()
+    trend_df = sales_trend(monthly)
 
     # ===================
     # CLAIMS
     # ===================
     if not claims.empty:
-        claims_agg = claims.groupby("dealer_id").agg(
+        claims_agg = claims.groupby("dealer_id", observed=True).agg(
             severity=("severity", "mean"),
             count=("claim_id", "count")
         ).reset_index()
@@ -39,10 +80,10 @@ def compute_health_score(sales, claims, crm, inv):
     # ===================
     # ENGAGEMENT (CR M)
     # ===================
-    crm["date"] = pd.to_datetime(crm["date"])
-    cutoff = crm["date"].max() - pd.Timedelta(days=90)
-    recent = crm[crm["date"] >= cutoff]
-    crm_agg = recent.groupby("dealer_id").agg(
+    crm_date = pd.to_datetime(crm["date"])
+    cutoff = crm_date.max() - pd.Timedelta(days=CRM_WINDOW_DAYS)
+    recent = crm[crm_date >= cutoff]
+    crm_agg = recent.groupby("dealer_id", observed=True).agg(
         contacts=("interaction_type", "count"),
         avg_duration=("duration_mins", "mean")
     ).reset_index()
@@ -50,16 +91,16 @@ def compute_health_score(sales, claims, crm, inv):
     # ===================
     # INVENTORY
     # ===================
-    inv_agg = inv.groupby("dealer_id").agg(
-        age=("ageing_days", "mean"),
-        stock=("stock_units", "mean")
-    ).reset_index()
+    inv_agg = inventory_components(inv)
 
-    df = trend_df.merge(claims_agg, on="dealer_id", how="left") \
-                 .merge(crm_agg, on="dealer_id", how="left") \
-                 .merge(inv_agg, on="dealer_id", how="left")
+    return combine_components(trend_df, claims_agg, crm_agg, inv_agg)
 
-    df.fillna(0, inplace=True)
+
+def score_health(df):
+    """
+    Normalizes the raw components into s/e/c/a and adds health_score and health_bucket.
+    """
+    df = df.copy()
 
     # normalize components
     df["s"] = normalize(df["trend"])
@@ -67,17 +108,24 @@ def compute_health_score(sales, claims, crm, inv):
     df["e"] = normalize(df["contacts"])
     df["a"] = 1 - normalize(df["age"])          # lower age = good
 
+    w = HEALTH_WEIGHTS
     df["health_score"] = (
-        0.35 * df["s"] +
-        0.25 * df["e"] +
-        0.20 * df["c"] +
-        0.20 * df["a"]
+        w["s"] * df["s"] +
+        w["e"] * df["e"] +
+        w["c"] * df["c"] +
+        w["a"] * df["a"]
     ) * 100
 
     df["health_bucket"] = pd.cut(
         df["health_score"],
-        bins=[-1, 40, 70, 200],
-        labels=["High Risk", "Watchlist", "Healthy"]
+        bins=HEALTH_BINS,
+        labels=HEALTH_LABELS
     )
 
+    return df
+
+
+@timed("compute_health_score")
+def compute_health_score(sales, claims, crm, inv):
+    df = score_health(health_components(sales, claims, crm, inv))
     return df[["dealer_id", "health_score", "health_bucket"]]
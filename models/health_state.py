@@ -0,0 +1,195 @@
+import argparse
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.data_store import TABLES, snapshot_dir, source_path
+from utils.schema import date_columns
+from .churn_model import churn_from_health
+from .health_score import sales_trend, score_health
+from .health_stream import (
+    CHUNK_ROWS, CLAIMS_COLS, CRM_COLS, SALES_COLS, HealthAggregates, read_chunks,
+)
+
+STATE_FILE = "health_state.pkl"
+TREND_ROWS = 6
+
+
+def state_path(data_dir=None):
+    return os.path.join(snapshot_dir(data_dir), STATE_FILE)
+
+
+class HealthState(HealthAggregates):
+    """
+    Persisted health aggregates that take appended delta batches (new sales, claims,
+    CRM interactions, inventory snapshots). Monthly units live in a dense
+    dealer × month matrix, so a delta only touches its own cells; the trend is
+    recomputed for the dealers the delta touched, and the global normalization
+    step is re-run on the cached per-dealer components.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.dealer_index = pd.Index([], dtype=object)
+        self.month_index = pd.PeriodIndex([], freq="M")
+        self.units = np.zeros((0, 0))
+        self.present = np.zeros((0, 0), dtype=bool)   # dealer had a sales row that month
+        self.trend = pd.Series(dtype="float64", name="trend")
+        self.inv = None
+        self._dirty = set()
+
+    # ===================
+    # DELTAS
+    # ===================
+
+    def _grow(self, dealer_ids, months):
+        # plain object labels, whether the batch has categorical (snapshot) or string keys
+        new_d = pd.Index(np.asarray(dealer_ids, dtype=object)).unique().difference(self.dealer_index)
+        new_m = pd.PeriodIndex(months, freq="M").unique().difference(self.month_index)
+        if len(new_d) == 0 and len(new_m) == 0:
+            return
+        self.dealer_index = self.dealer_index.append(new_d) if len(self.dealer_index) else new_d
+        self.month_index = self.month_index.append(new_m)
+        shape = (len(self.dealer_index), len(self.month_index))
+        units, present = np.zeros(shape), np.zeros(shape, dtype=bool)
+        r, c = self.units.shape
+        units[:r, :c], present[:r, :c] = self.units, self.present
+
+        # keep month columns in calendar order (late batches may bring older months)
+        order = np.argsort(self.month_index.asi8, kind="stable")
+        self.month_index = self.month_index[order]
+        self.units, self.present = units[:, order], present[:, order]
+
+    def add_sales(self, chunk):
+        month = chunk["date"].dt.to_period("M").rename("month")
+        part = chunk.groupby([chunk["dealer_id"], month], observed=True)["units_sold"].sum()
+        dealers = part.index.get_level_values(0)
+        months = part.index.get_level_values(1)
+        self._grow(dealers, months)
+
+        rows = self.dealer_index.get_indexer(dealers)
+        cols = self.month_index.get_indexer(months)
+        np.add.at(self.units, (rows, cols), part.to_numpy(dtype="float64"))
+        self.present[rows, cols] = True
+        self._dirty.update(dealers.unique())
+
+    def add_inventory(self, inv):
+        """
+        Replaces the stock/ageing snapshot of every dealer × model in `inv`.
+        """
+        merged = inv if self.inv is None else pd.concat([self.inv, inv], ignore_index=True)
+        self.inv = merged.drop_duplicates(["dealer_id", "model"], keep="last").reset_index(drop=True)
+
+    def apply_delta(self, sales=None, claims=None, crm=None, inv=None):
+        """
+        Folds a batch of new rows into the state and returns the refreshed scores.
+        """
+        if sales is not None and not sales.empty:
+            self.add_sales(sales)
+        if claims is not None and not claims.empty:
+            self.add_claims(claims)
+        if crm is not None and not crm.empty:
+            self.add_crm(crm)
+        if inv is not None and not inv.empty:
+            self.add_inventory(inv)
+        return self.scores()
+
+    # ===================
+    # SCORES
+    # ===================
+
+    def _refresh_trend(self):
+        if not self._dirty:
+            return
+        rows = self.dealer_index.get_indexer(list(self._dirty))
+        present = self.present[rows]
+        # rolling3 and prev3 at the latest month only need a dealer's last six monthly rows
+        from_end = np.cumsum(present[:, ::-1], axis=1)[:, ::-1]
+        r, c = np.nonzero(present & (from_end <= TREND_ROWS))
+        monthly = pd.DataFrame({
+            "dealer_id": self.dealer_index[rows][r],
+            "month": self.month_index[c],
+            "units_sold": self.units[rows][r, c],
+        })
+        fresh = sales_trend(monthly).set_index("dealer_id")["trend"]
+        kept = self.trend.drop(fresh.index, errors="ignore")
+        self.trend = pd.concat([kept, fresh]) if len(kept) else fresh
+        self._dirty.clear()
+
+    def trend_frame(self):
+        self._refresh_trend()
+        trend = self.trend.sort_index()
+        trend.index.name = "dealer_id"
+        return trend.rename("trend").reset_index()
+
+    def scores(self):
+        """
+        dealer_id, health_score, health_bucket, churn_prob, risk_bucket for every dealer.
+        """
+        df = churn_from_health(score_health(self.components(self.inv)))
+        return df[["dealer_id", "health_score", "health_bucket", "churn_prob", "risk_bucket"]]
+
+    # ===================
+    # PERSISTENCE
+    # ===================
+
+    @classmethod
+    def from_tables(cls, sales, claims, crm, inv):
+        state = cls()
+        state.apply_delta(sales, claims, crm, inv)
+        return state
+
+    @classmethod
+    def from_csv(cls, data_dir=None, chunksize=CHUNK_ROWS):
+        """
+        Builds the state from the full source CSVs, streaming them in chunks.
+        """
+        state = cls()
+        for chunk in read_chunks("sales", SALES_COLS, data_dir, chunksize):
+            state.add_sales(chunk)
+        for chunk in read_chunks("claims", CLAIMS_COLS, data_dir, chunksize):
+            state.add_claims(chunk)
+        for chunk in read_chunks("crm", CRM_COLS, data_dir, chunksize):
+            state.add_crm(chunk)
+        state.add_inventory(pd.read_csv(source_path(TABLES["inv"], data_dir)))
+        return state
+
+    def save(self, path=None):
+        path = path or state_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path=None):
+        with open(path or state_path(), "rb") as f:
+            return pickle.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the incremental health/churn state.")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the state from the full CSVs")
+    for table in ("sales", "claims", "crm", "inv"):
+        parser.add_argument(f"--{table}", metavar="CSV", help=f"append a {table} delta batch")
+    parser.add_argument("--out", default=None, help="write the refreshed scores to this CSV")
+    args = parser.parse_args()
+
+    state = HealthState.from_csv() if args.rebuild else HealthState.load()
+    deltas = {}
+    for table in ("sales", "claims", "crm", "inv"):
+        path = getattr(args, table)
+        if path:
+            deltas[table] = pd.read_csv(path, parse_dates=date_columns(table))
+
+    start = time.perf_counter()
+    scores = state.apply_delta(**deltas) if deltas else state.scores()
+    print(f"scores for {len(scores)} dealers refreshed in {time.perf_counter() - start:.3f}s")
+    state.save()
+    if args.out:
+        scores.to_csv(args.out, index=False)
@@ -0,0 +1,121 @@
+import pandas as pd
+
+from utils.data_store import TABLES, source_path
+from utils.schema import date_columns
+from .health_score import (
+    CRM_WINDOW_DAYS, combine_components, inventory_components, sales_trend, score_health,
+)
+
+CHUNK_ROWS = 1_000_000
+
+SALES_COLS = ["date", "dealer_id", "units_sold"]
+CLAIMS_COLS = ["dealer_id", "claim_id", "severity"]
+CRM_COLS = ["dealer_id", "date", "interaction_type", "duration_mins"]
+
+
+def _add(total, part):
+    return part if total is None else total.add(part, fill_value=0)
+
+
+class HealthAggregates:
+    """
+    Partial aggregates behind the health score, built chunk by chunk:
+    - units per dealer × month
+    - claim severity sum/count and claim count per dealer
+    - CRM contacts and duration sum/count per dealer × day, pruned to the last
+      CRM_WINDOW_DAYS of the newest date seen (older days can never re-enter the window)
+    Memory is O(dealers × months), independent of the number of transactions.
+    """
+
+    def __init__(self):
+        self.monthly = None
+        self.claims = None
+        self.crm = None
+        self.crm_max = None
+
+    def add_sales(self, chunk):
+        month = chunk["date"].dt.to_period("M").rename("month")
+        part = chunk.groupby([chunk["dealer_id"], month], observed=True)["units_sold"].sum()
+        self.monthly = _add(self.monthly, part)
+
+    def add_claims(self, chunk):
+        part = chunk.groupby("dealer_id", observed=True).agg(
+            severity_sum=("severity", "sum"),
+            severity_n=("severity", "count"),
+            count=("claim_id", "count"),
+        )
+        self.claims = _add(self.claims, part)
+
+    def add_crm(self, chunk):
+        if chunk.empty:
+            return
+        part = chunk.groupby(["dealer_id", "date"], observed=True).agg(
+            contacts=("interaction_type", "count"),
+            duration_sum=("duration_mins", "sum"),
+            duration_n=("duration_mins", "count"),
+        )
+        self.crm = _add(self.crm, part)
+        latest = chunk["date"].max()
+        self.crm_max = latest if self.crm_max is None else max(self.crm_max, latest)
+        cutoff = self.crm_max - pd.Timedelta(days=CRM_WINDOW_DAYS)
+        self.crm = self.crm[self.crm.index.get_level_values("date") >= cutoff]
+
+    def trend_frame(self):
+        monthly = self.monthly.rename("units_sold").reset_index()
+        return sales_trend(monthly)
+
+    def claims_frame(self):
+        if self.claims is None:
+            return pd.DataFrame(columns=["dealer_id", "severity", "count"])
+        return pd.DataFrame({
+            "severity": self.claims["severity_sum"] / self.claims["severity_n"],
+            "count": self.claims["count"],
+        }).reset_index()
+
+    def crm_frame(self):
+        if self.crm is None:
+            return pd.DataFrame(columns=["dealer_id", "contacts", "avg_duration"])
+        per_dealer = self.crm.groupby(level="dealer_id", observed=True).sum()
+        return pd.DataFrame({
+            "contacts": per_dealer["contacts"],
+            "avg_duration": per_dealer["duration_sum"] / per_dealer["duration_n"],
+        }).reset_index()
+
+    def components(self, inv):
+        """
+        Finalizes the aggregates into the same frame as health_components.
+        """
+        return combine_components(
+            self.trend_frame(), self.claims_frame(), self.crm_frame(), inventory_components(inv)
+        )
+
+
+def read_chunks(table, columns, data_dir=None, chunksize=CHUNK_ROWS):
+    """
+    Iterates over a source CSV in chunks of `chunksize` rows, reading only `columns`.
+    """
+    return pd.read_csv(
+        source_path(TABLES[table], data_dir), usecols=columns,
+        parse_dates=[c for c in date_columns(table) if c in columns], chunksize=chunksize,
+    )
+
+
+def streaming_health_components(data_dir=None, chunksize=CHUNK_ROWS):
+    """
+    health_components computed by reading sales, claims and CRM CSVs in chunks.
+    """
+    agg = HealthAggregates()
+    for chunk in read_chunks("sales", SALES_COLS, data_dir, chunksize):
+        agg.add_sales(chunk)
+    for chunk in read_chunks("claims", CLAIMS_COLS, data_dir, chunksize):
+        agg.add_claims(chunk)
+    for chunk in read_chunks("crm", CRM_COLS, data_dir, chunksize):
+        agg.add_crm(chunk)
+
+    inv = pd.read_csv(source_path(TABLES["inv"], data_dir))
+    return agg.components(inv)
+
+
+def streaming_health_score(data_dir=None, chunksize=CHUNK_ROWS):
+    df = score_health(streaming_health_components(data_dir, chunksize))
+    return df[["dealer_id", "health_score", "health_bucket"]]
@@ -0,0 +1,221 @@
+"""
+Hierarchical forecasting over OEM → region → state → dealer → model.
+
+Full SARIMAX is fitted only at the aggregate nodes with a strong signal (by default
+OEM, region and state with at least MIN_SARIMAX_UNITS a month and SARIMAX_HISTORY
+months of history, enough for the seasonal difference); every other node, and any
+fit whose forecast level strays from the node's last year, gets the vectorized
+Holt-Winters forecast. The base forecasts are then reconciled so that every level
+sums up exactly:
+
+    mint       MinT with structural WLS weights (each node weighted by its bottom-series count)
+    top_down   the OEM forecast split by each series' share of the last SEASON months
+    bottom_up  the bottom forecasts summed up (no SARIMAX fits at all)
+
+    python -m models.hierarchy --method mint
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from utils.perf import timed
+from .forecast_model import MAX_HORIZON, SEASON, _fast, _run_tasks, series_matrix
+
+LEVELS = ("oem", "region", "state", "dealer", "model")
+SARIMAX_LEVELS = ("oem", "region", "state")
+RECONCILIATION = ("mint", "top_down", "bottom_up")
+MIN_SARIMAX_UNITS = 100     # mean monthly units a node needs to get its own SARIMAX fit
+SARIMAX_HISTORY = 2 * SEASON + 1    # months a seasonally differenced (1,1,1)(1,1,1,12) fit needs
+MAX_LEVEL_RATIO = 1.5       # a fit whose mean forecast is beyond ×/÷ this of the last year is dropped
+
+# label of the hierarchy columns a node is not split by (e.g. the region of the OEM node)
+ALL = "(all)"
+UNKNOWN = "(unknown)"
+
+HIERARCHY_COLUMNS = ["level", "region", "state", "dealer_id", "model", "base",
+                     "step", "month", "forecast_units"]
+# repeated once per node and step: stored as categoricals, not Python strings
+HIERARCHY_LABELS = ["level", "region", "state", "dealer_id", "model", "base", "month"]
+
+# hierarchy columns that identify a node of each aggregate level
+_LEVEL_KEYS = {
+    "oem": [],
+    "region": ["region"],
+    "state": ["region", "state"],
+    "dealer": ["region", "state", "dealer_id"],
+}
+
+
+def hierarchy_nodes(dealer, keys):
+    """
+    Node table and summing matrix of the hierarchy over the bottom series `keys`
+    (dealer_id, model). Returns (nodes, S): nodes has level, region, state, dealer_id
+    and model, aggregate nodes first (OEM is row 0) and the bottom series last, in
+    the order of `keys`; S is the sparse aggregate × bottom 0/1 summing matrix.
+    States are nested under their region, so the hierarchy stays a tree.
+    """
+    from scipy import sparse
+
+    bottom = keys.merge(dealer[["dealer_id", "region", "state"]], on="dealer_id", how="left")
+    bottom = bottom.astype(object)     # node labels mix in ALL/UNKNOWN, outside the categories
+    bottom[["region", "state"]] = bottom[["region", "state"]].fillna(UNKNOWN)
+
+    nodes, rows, offset = [], [], 0
+    for level, cols in _LEVEL_KEYS.items():
+        if cols:
+            codes = bottom.groupby(cols, sort=True).ngroup().to_numpy()
+            labels = bottom[cols].drop_duplicates().sort_values(cols).reset_index(drop=True)
+        else:
+            codes = np.zeros(len(bottom), dtype="int64")
+            labels = pd.DataFrame(index=[0])
+        labels.insert(0, "level", level)
+        nodes.append(labels)
+        rows.append(codes + offset)
+        offset += len(labels)
+
+    n = len(bottom)
+    S = sparse.csr_matrix(
+        (np.ones(n * len(rows)), (np.concatenate(rows), np.tile(np.arange(n), len(rows)))),
+        shape=(offset, n),
+    )
+    bottom.insert(0, "level", "model")
+    nodes = pd.concat(nodes + [bottom], ignore_index=True)
+    nodes = nodes[["level", "region", "state", "dealer_id", "model"]].fillna(ALL)
+    return nodes, S
+
+
+# ===================
+# BASE FORECASTS
+# ===================
+
+def _sarimax_nodes(levels, y, sarimax_levels, min_units):
+    history = y.shape[1] - (y > 0).argmax(axis=1)    # months since the first sale
+    strong = (history >= SARIMAX_HISTORY) & (y.mean(axis=1) >= min_units)
+    return np.flatnonzero(np.isin(levels, sarimax_levels) & strong)
+
+
+def _plausible(fc, y):
+    # SARIMAX rows whose mean forecast stays within MAX_LEVEL_RATIO of the last SEASON months
+    recent = y[:, -SEASON:].mean(axis=1)
+    level = fc.mean(axis=1)
+    return (np.isfinite(fc).all(axis=1)
+            & (level <= recent * MAX_LEVEL_RATIO) & (level >= recent / MAX_LEVEL_RATIO))
+
+
+def base_forecasts(nodes, y, months, periods, sarimax_levels=SARIMAX_LEVELS,
+                   min_units=MIN_SARIMAX_UNITS, workers=None, data_dir=None):
+    """
+    Incoherent base forecasts (node × step) for the node histories `y` (node × month).
+    Nodes whose SARIMAX forecast is not plausible keep their Holt-Winters base.
+    Returns (forecasts, base method per node).
+    """
+    fc = _fast(y, periods, "holt_winters")
+    base = np.full(len(y), "holt_winters", dtype=object)
+
+    fit = _sarimax_nodes(nodes["level"].to_numpy(), y, sarimax_levels, min_units)
+    if len(fit):
+        index = months.to_timestamp(how="end").normalize()
+        first = (y[fit] > 0).argmax(axis=1)    # drop the zero padding before a node starts
+        tasks = [
+            (f"hierarchy:{nodes.at[i, 'level']}", "/".join(nodes.loc[i, ["region", "state", "dealer_id"]]),
+             pd.Series(y[i, f:], index=index[f:]), periods)
+            for i, f in zip(fit, first)
+        ]
+        rows = _run_tasks(tasks, workers, data_dir)
+        sarimax = np.array([r[4] for r in rows]).reshape(len(fit), periods)
+        keep = _plausible(sarimax, y[fit])
+        fc[fit[keep]] = sarimax[keep]
+        base[fit[keep]] = "sarimax"
+    return fc, base
+
+
+# ===================
+# RECONCILIATION
+# ===================
+
+def reconcile(S, base_agg, base_bottom, method="mint", history=None):
+    """
+    Coherent bottom-level forecasts from the base forecasts of the aggregate nodes
+    (rows of S) and the bottom series. `history` (bottom × month) gives the top-down
+    proportions. Negative bottom forecasts are clipped to 0 afterwards; the
+    aggregate levels are always rebuilt as S @ bottom, so they stay coherent.
+    """
+    if method == "bottom_up":
+        bottom = base_bottom
+    elif method == "top_down":
+        recent = history[:, -SEASON:].sum(axis=1)
+        total = recent.sum()
+        shares = recent / total if total > 0 else np.full(len(recent), 1 / len(recent))
+        bottom = shares[:, None] * base_agg[0]
+    elif method == "mint":
+        # WLS-structural MinT: W = diag(bottom-series count per node), bottom nodes 1.
+        # ỹ_b = ŷ_b + Sᵀ (W_agg + S Sᵀ)⁻¹ (ŷ_agg - S ŷ_b), a sparse system of aggregate size.
+        from scipy import sparse
+        from scipy.sparse.linalg import spsolve
+
+        counts = np.asarray(S.sum(axis=1)).ravel()
+        system = (sparse.diags(counts) + S @ S.T).tocsc()
+        gap = spsolve(system, base_agg - S @ base_bottom)
+        bottom = base_bottom + S.T @ gap.reshape(base_agg.shape)
+    else:
+        raise ValueError(f"Unknown reconciliation method: {method}")
+    return np.clip(bottom, 0, None)
+
+
+@timed("hierarchy_forecast")
+def hierarchy_forecast(dealer, sales, periods=MAX_HORIZON, method="mint",
+                       sarimax_levels=SARIMAX_LEVELS, min_units=MIN_SARIMAX_UNITS, workers=None,
+                       data_dir=None):
+    """
+    Coherent forecasts for every node of the hierarchy from the dealer master and
+    monthly (or raw) sales. Unlike batch_forecast, every dealer×model series is kept,
+    short ones included, so the levels add up to the OEM total.
+    Returns one long table in HIERARCHY_COLUMNS, labels (HIERARCHY_LABELS) as
+    categoricals; the model level matches FORECAST_COLUMNS.
+    """
+    if sales.empty:
+        return pd.DataFrame(columns=HIERARCHY_COLUMNS).astype(dict.fromkeys(HIERARCHY_LABELS, "category"))
+
+    keys, months, y_bottom, _ = series_matrix(sales)
+    nodes, S = hierarchy_nodes(dealer, keys)
+    n_agg = S.shape[0]
+    y_agg = S @ y_bottom
+
+    fit_levels = () if method == "bottom_up" else ("oem",) if method == "top_down" else sarimax_levels
+    fc, base = base_forecasts(nodes, np.vstack([y_agg, y_bottom]), months, periods,
+                              fit_levels, min_units, workers, data_dir)
+    bottom = reconcile(S, fc[:n_agg], fc[n_agg:], method, history=y_bottom)
+    fc = np.vstack([S @ bottom, bottom])
+
+    future = pd.period_range(months[-1] + 1, periods=periods, freq="M").strftime("%Y-%m")
+    labels = nodes.astype("category")
+    labels["level"] = pd.Categorical(nodes["level"], categories=LEVELS)
+    labels["base"] = pd.Categorical(base)
+    out = labels.loc[labels.index.repeat(periods)].reset_index(drop=True)
+    out["step"] = np.tile(np.arange(1, periods + 1), len(nodes))
+    out["month"] = pd.Categorical.from_codes(np.tile(np.arange(periods), len(nodes)), categories=future)
+    out["forecast_units"] = fc.ravel()
+    return out[HIERARCHY_COLUMNS]
+
+
+if __name__ == "__main__":
+    from utils.data_store import data_version, load_tables, save_derived
+
+    parser = argparse.ArgumentParser(description="Reconciled forecasts for every level of the dealer hierarchy.")
+    parser.add_argument("--method", choices=RECONCILIATION, default="mint")
+    parser.add_argument("--periods", type=int, default=MAX_HORIZON)
+    parser.add_argument("--min-units", type=float, default=MIN_SARIMAX_UNITS,
+                        help="mean monthly units an aggregate node needs for a SARIMAX fit")
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    args = parser.parse_args()
+
+    dealer, sales = load_tables(("dealer", "sales"))
+    table = hierarchy_forecast(dealer, sales, args.periods, args.method,
+                               min_units=args.min_units, workers=args.workers)
+    nodes = table[table["step"] == 1]
+    print(nodes.groupby("level", sort=False, observed=True)["base"].value_counts().unstack(fill_value=0).to_string())
+    print(f"{(nodes['base'] == 'sarimax').sum()} SARIMAX fits for {len(nodes)} nodes")
+    if args.method == "mint":
+        path = save_derived("hierarchy_forecast", table, data_version())
+        print(f"{len(table)} forecast rows written to {path}")
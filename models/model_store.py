@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.data_store import snapshot_dir
+
+MAX_DISK_ENTRIES = 20000   # fitted parameter files kept on disk (LRU by mtime)
+EVICT_TO = 0.8             # an eviction trims the store to this share of MAX_DISK_ENTRIES
+EVICT_EVERY = 256          # saves in this process between two checks of the store size
+MAX_MEMORY_ENTRIES = 256   # results objects kept in this process
+
+# key -> fitted results, most recently used last; shared by the sessions' threads
+_RESULTS = OrderedDict()
+_lock = threading.Lock()
+_saves = 0
+
+
+def store_dir(data_dir=None):
+    """
+    Fitted SARIMAX parameters of one dataset, inside its snapshot folder.
+    """
+    return os.path.join(snapshot_dir(data_dir), "sarimax")
+
+
+def series_hash(series):
+    """
+    Content hash of a monthly series (index and values).
+    """
+    h = hashlib.sha256()
+    h.update(np.asarray(series.index, dtype="datetime64[ns]").tobytes())
+    h.update(np.asarray(series.values, dtype="float64").tobytes())
+    return h.hexdigest()[:16]
+
+
+def _lineage(dealer_id, model_name, order, seasonal_order, model_kwargs):
+    spec = json.dumps([str(dealer_id), str(model_name), list(order), list(seasonal_order),
+                       sorted(model_kwargs.items())])
+    return hashlib.sha256(spec.encode()).hexdigest()[:16]
+
+
+def _save_params(path, results, data_dir=None):
+    global _saves
+    tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"params": results.params.tolist(), "names": list(results.model.param_names)}, f)
+    os.replace(tmp, path)
+    with _lock:
+        _saves += 1
+        check = _saves % EVICT_EVERY == 0
+    if check:
+        evict_store(data_dir=data_dir)
+
+
+def _load_params(path):
+    with open(path) as f:
+        return np.asarray(json.load(f)["params"])
+
+
+def _latest(folder):
+    # fits of one dealer/model lineage: a handful of files in its own folder
+    try:
+        entries = [e for e in os.scandir(folder) if e.name.endswith(".json")]
+    except FileNotFoundError:
+        return None
+    return max(entries, key=lambda e: e.stat().st_mtime).path if entries else None
+
+
+def _files(folder):
+    for entry in os.scandir(folder):
+        if entry.is_dir():
+            yield from (e for e in os.scandir(entry.path) if e.name.endswith(".json"))
+        elif entry.name.endswith(".json"):
+            yield entry
+
+
+def evict_store(max_entries=MAX_DISK_ENTRIES, data_dir=None):
+    """
+    Once the store holds more than max_entries fits, deletes the least recently used
+    down to EVICT_TO of it. Runs every EVICT_EVERY saves and after each batch, not per fit.
+    """
+    folder = store_dir(data_dir)
+    if not os.path.isdir(folder):
+        return
+    entries = list(_files(folder))
+    if len(entries) <= max_entries:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for entry in entries[:len(entries) - int(max_entries * EVICT_TO)]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass  # evicted by another worker
+
+
+def _cached(key):
+    with _lock:
+        results = _RESULTS.get(key)
+        if results is not None:
+            _RESULTS.move_to_end(key)
+        return results
+
+
+def _remember(key, results):
+    with _lock:
+        _RESULTS[key] = results
+        _RESULTS.move_to_end(key)
+        while len(_RESULTS) > MAX_MEMORY_ENTRIES:
+            _RESULTS.popitem(last=False)
+
+
+def fit_sarimax(series, dealer_id=None, model_name=None,
+                order=(1,1,1), seasonal_order=(1,1,1,12), data_dir=None, **model_kwargs):
+    """
+    SARIMAX results for a series, reusing earlier fits where possible:
+    - same data already fitted in this process: the cached results object
+    - same data fitted before (on disk): stored params are re-filtered, no optimization
+    - new data for a known dealer/model: refit warm-started from the previous params
+    Fits are stored under the snapshot of `data_dir` (default: data/ or $KAM_DATA_DIR).
+    """
+    lineage = _lineage(dealer_id, model_name, order, seasonal_order, model_kwargs)
+    key = f"{lineage}-{series_hash(series)}"
+    results = _cached(key)
+    if results is not None:
+        return results
+
+    from statsmodels.tsa.statespace.sarimax import SARIMAX   # heavy; only when a fit is needed
+
+    model = SARIMAX(series, order=order, seasonal_order=seasonal_order, **model_kwargs)
+    folder = os.path.join(store_dir(data_dir), lineage)
+    path = os.path.join(folder, f"{key}.json")
+
+    if os.path.exists(path):
+        results = model.filter(_load_params(path))
+        os.utime(path)
+    else:
+        previous = None
+        if dealer_id is not None and model_name is not None:
+            previous = _latest(folder)
+        os.makedirs(folder, exist_ok=True)
+        start_params = _load_params(previous) if previous else None
+        if start_params is not None and len(start_params) != len(model.start_params):
+            start_params = None
+        results = model.fit(start_params=start_params, disp=False)
+        _save_params(path, results, data_dir)
+
+    _remember(key, results)
+    return results
@@ -0,0 +1,135 @@
+import time
+
+import pandas as pd
+
+from utils.data_store import TABLES, data_version, load_derived, load_tables, save_derived
+from utils.perf import span
+from .cube import build_cube, monthly_sales
+from .dealer_features import build_dealer_features
+from .health_backends import HEALTH_BACKEND, snapshot_health_components
+from .forecast_model import MAX_HORIZON, batch_forecast
+from .health_history import health_history
+from .hierarchy import hierarchy_forecast
+from .segmentation import K_RANGE, feature_matrix, fit_segments, segment_frame
+
+
+# ===================
+# BUILDERS
+# ===================
+
+def _cube(tables, version, data_dir=None, workers=None):
+    t = tables
+    return {"cube": build_cube(t["sales"], t["claims"], t["crm"])}
+
+
+def _features(tables, version, data_dir=None, workers=None):
+    t = tables
+    components = None
+    if HEALTH_BACKEND != "pandas":
+        components = snapshot_health_components(HEALTH_BACKEND, data_dir)
+    return {"features": build_dealer_features(t["sales"], t["claims"], t["crm"], t["inv"], t["feedback"],
+                                              components)}
+
+
+def _history(tables, version, data_dir=None, workers=None):
+    t = tables
+    return {"health_history": health_history(t["sales"], t["claims"], t["crm"], t["inv"])}
+
+
+def _segments(tables, version, data_dir=None, workers=None):
+    features = artifact("features", version, tables, data_dir)
+    sales = monthly_sales(artifact("cube", version, tables, data_dir))
+    df = segment_frame(tables["dealer"], sales, features)
+    fits = fit_segments(feature_matrix(df), K_RANGE)
+    labels = pd.DataFrame({f"cluster_{k}": r["labels"] for k, r in fits.items()})
+    quality = pd.DataFrame(
+        [{"k": k, "inertia": r["inertia"], "silhouette": r["silhouette"]} for k, r in fits.items()]
+    )
+    return {"segment_quality": quality, "segments": pd.concat([df, labels], axis=1)}
+
+
+def _hierarchy(tables, version, data_dir=None, workers=None):
+    sales = monthly_sales(artifact("cube", version, tables, data_dir))
+    table = hierarchy_forecast(tables["dealer"], sales, periods=MAX_HORIZON, workers=workers, data_dir=data_dir)
+    totals = table[table["level"] != "model"].reset_index(drop=True)
+    totals = totals.assign(**{c: totals[c].cat.remove_unused_categories() for c in ("dealer_id", "model")})
+    return {"hierarchy_totals": totals, "hierarchy_forecast": table}
+
+
+def _forecast(tables, version, data_dir=None, workers=None):
+    sales = monthly_sales(artifact("cube", version, tables, data_dir))
+    return {"forecast": batch_forecast(sales, periods=MAX_HORIZON, workers=workers, data_dir=data_dir)}
+
+
+# step -> (published tables, builder), in priority order: the shared cube and what
+# the landing pages need first, the hierarchy (a few aggregate SARIMAX fits; its
+# aggregate levels are also published alone, small enough for the dashboard) next,
+# the slow portfolio forecast last. A builder's tables are saved in order, so a
+# reader that sees the last one can rely on the others.
+STEPS = {
+    "cube": (("cube",), _cube),
+    "features": (("features",), _features),
+    "health_history": (("health_history",), _history),
+    "segments": (("segment_quality", "segments"), _segments),
+    "hierarchy": (("hierarchy_totals", "hierarchy_forecast"), _hierarchy),
+    "forecast": (("forecast",), _forecast),
+}
+
+
+def _step_for(name):
+    for step, (outputs, _) in STEPS.items():
+        if name in outputs:
+            return step
+    raise ValueError(f"Unknown artifact: {name}")
+
+
+def _publish(step, tables, version, data_dir=None, workers=None):
+    outputs, build = STEPS[step]
+    with span(f"publish[{step}]"):
+        built = build(tables, version, data_dir, workers)
+    for name in outputs:
+        save_derived(name, built[name], version, data_dir)
+    return built
+
+
+# ===================
+# READ / RUN
+# ===================
+
+def artifact(name, version, tables=None, data_dir=None, build=True, workers=1):
+    """
+    The published table `name` for this data version. If the precompute worker has
+    not published it yet, it is built here (from `tables`, or the snapshot) and
+    published, unless build=False, which returns None instead. These builds run in
+    the caller's process (workers=1), as they may be in a page's request path;
+    parallel full builds are left to run_pipeline (python -m models.precompute).
+    """
+    df = load_derived(name, version, data_dir)
+    if df is not None or not build:
+        return df
+    if tables is None:
+        tables = dict(zip(TABLES, load_tables(data_dir=data_dir)))
+    return _publish(_step_for(name), tables, version, data_dir, workers)[name]
+
+
+def run_pipeline(data_dir=None, steps=tuple(STEPS), workers=None, force=False, log=print):
+    """
+    Builds and publishes every missing artifact of `steps` for the current data version.
+    Returns (version, {step: seconds}) for the steps that ran.
+    """
+    version = data_version(data_dir)
+    tables, timings = None, {}
+    for step in STEPS:
+        if step not in steps:
+            continue
+        outputs, _ = STEPS[step]
+        if not force and load_derived(outputs[-1], version, data_dir) is not None:
+            continue
+        if tables is None:
+            tables = dict(zip(TABLES, load_tables(data_dir=data_dir)))
+        start = time.perf_counter()
+        _publish(step, tables, version, data_dir, workers)
+        timings[step] = time.perf_counter() - start
+        if log:
+            log(f"[{version}] {step} published in {timings[step]:.2f}s")
+    return version, timings
@@ -0,0 +1,61 @@
+import argparse
+import threading
+import traceback
+
+from utils.data_store import data_version, prune_derived
+from .pipeline import STEPS, run_pipeline
+
+POLL_SECONDS = 10
+
+
+def watch(data_dir=None, steps=tuple(STEPS), workers=None, interval=POLL_SECONDS, stop=None, log=print):
+    """
+    Polls the source CSVs and, whenever the data version changes, publishes every
+    derived table for the new version, then drops the ones of older versions.
+    Polling is cheap: data_version() only re-hashes files whose mtime/size changed.
+    Runs until `stop` (a threading.Event) is set.
+    """
+    stop = stop or threading.Event()
+    published = None
+    while not stop.is_set():
+        try:
+            version = data_version(data_dir)
+            if version != published:
+                run_pipeline(data_dir, steps=steps, workers=workers, log=log)
+                prune_derived(version, data_dir)
+                published = version
+        except Exception:
+            # keep serving the last published version; retry on the next poll
+            if log:
+                log(traceback.format_exc())
+        stop.wait(interval)
+
+
+def start_worker(data_dir=None, steps=tuple(STEPS), workers=None, interval=POLL_SECONDS):
+    """
+    Runs watch() in a daemon thread inside the current process; returns (thread, stop event).
+    """
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=watch, name="kam-precompute", daemon=True,
+        kwargs={"data_dir": data_dir, "steps": steps, "workers": workers, "interval": interval, "stop": stop},
+    )
+    thread.start()
+    return thread, stop
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute and publish the derived tables the pages read.")
+    parser.add_argument("--data-dir", default=None, help="source CSV folder (default: data/ or $KAM_DATA_DIR)")
+    parser.add_argument("--steps", default=",".join(STEPS), help=f"comma-separated subset of {', '.join(STEPS)}")
+    parser.add_argument("--workers", type=int, default=None, help="processes for the forecast step")
+    parser.add_argument("--interval", type=float, default=POLL_SECONDS, help="seconds between polls")
+    parser.add_argument("--once", action="store_true", help="publish the current version and exit")
+    args = parser.parse_args()
+
+    steps = tuple(s for s in args.steps.split(",") if s)
+    if args.once:
+        version, _ = run_pipeline(args.data_dir, steps=steps, workers=args.workers)
+        prune_derived(version, args.data_dir)
+    else:
+        watch(args.data_dir, steps=steps, workers=args.workers, interval=args.interval)
@@ -0,0 +1,63 @@
+import numpy as np
+
+from utils.perf import timed
+
+# clustering inputs: value, sentiment, health/churn and the raw risk components
+FEATURES = ["units_sold", "sentiment_avg", "health_score", "churn_prob", "age", "severity"]
+
+K_RANGE = range(2, 7)           # matches the page's "Number of clusters" slider
+MINIBATCH_THRESHOLD = 10_000    # dealers above which MiniBatchKMeans is used
+SILHOUETTE_SAMPLE = 5_000       # dealers sampled for the silhouette score
+
+
+def segment_frame(dealer, sales, features):
+    """
+    One row per dealer with total units sold and the FEATURES columns (missing -> 0).
+    """
+    vol = sales.groupby("dealer_id", observed=True)["units_sold"].sum().reset_index()
+    cols = [c for c in FEATURES if c != "units_sold"]
+    df = (
+        dealer
+        .merge(vol, on="dealer_id")
+        .merge(features[["dealer_id"] + cols], on="dealer_id", how="left")
+    )
+    df[cols] = df[cols].fillna(0)
+    return df
+
+
+def feature_matrix(df, columns=FEATURES):
+    """
+    Standardized (zero mean, unit variance) clustering matrix.
+    """
+    from sklearn.preprocessing import StandardScaler
+
+    return StandardScaler().fit_transform(df[columns].to_numpy(dtype="float64"))
+
+
+@timed("fit_segments")
+def fit_segments(X, k_values=K_RANGE, random_state=0):
+    """
+    Fits every k in k_values on X and returns {k: {"labels", "inertia", "silhouette"}}.
+    Large inputs use MiniBatchKMeans and a sampled silhouette.
+    """
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+    from sklearn.metrics import silhouette_score
+
+    n = len(X)
+    results = {}
+    for k in k_values:
+        if n <= k:
+            continue
+        if n > MINIBATCH_THRESHOLD:
+            model = MiniBatchKMeans(n_clusters=k, batch_size=4096, n_init=3, random_state=random_state)
+        else:
+            model = KMeans(n_clusters=k, n_init="auto", random_state=random_state)
+        labels = model.fit_predict(X)
+
+        silhouette = np.nan
+        if len(np.unique(labels)) > 1:
+            silhouette = silhouette_score(
+                X, labels, sample_size=min(n, SILHOUETTE_SAMPLE), random_state=random_state
+            )
+        results[k] = {"labels": labels, "inertia": float(model.inertia_), "silhouette": float(silhouette)}
+    return results
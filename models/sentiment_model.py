@@ -1,8 +1,16 @@
+import numpy as np
 import pandas as pd
 
+from utils.perf import timed
+
 POS = {"good", "satisfied", "appreciated", "timely", "support", "excellent", "happy"}
 NEG = {"delay", "delays", "insufficient", "bad", "poor", "complaint", "issue", "problem", "pressure", "trust"}
 
+MAX_CACHE = 1_000_000   # distinct comments remembered across calls
+
+# comment text -> score, reused across calls (feedback comments repeat heavily)
+_SCORE_CACHE = {}
+
 
 def sentiment_score(text):
     if not isinstance(text, str):
@@ -15,17 +23,52 @@ def sentiment_score(text):
     return (p - n) / (p + n)
 
 
+def _score_unique(texts):
+    # same rule as sentiment_score, on a Series of distinct comments at once
+    texts = texts.where(texts.map(lambda v: isinstance(v, str)))
+    tokens = texts.str.lower().str.split().explode()
+    p = tokens.isin(POS).groupby(level=0).sum()
+    n = tokens.isin(NEG).groupby(level=0).sum()
+    scores = ((p - n) / (p + n).replace(0, np.nan)).fillna(0.0)
+    return scores.reindex(texts.index, fill_value=0.0)
+
+
+def score_comments(comments):
+    """
+    Sentiment score for every comment; each distinct text is scored once and cached.
+    """
+    codes, uniques = pd.factorize(comments)
+    uniques = pd.Series(uniques, dtype=object)
+    # per-text lookups: Series.map(dict) would convert the whole cache on every call
+    known = pd.Series([_SCORE_CACHE.get(t, np.nan) for t in uniques], index=uniques.index, dtype="float64")
+
+    missing = uniques[known.isna()]
+    if len(missing):
+        scores = _score_unique(missing)
+        if len(_SCORE_CACHE) + len(missing) > MAX_CACHE:
+            _SCORE_CACHE.clear()
+        _SCORE_CACHE.update(zip(missing, scores))
+        known = known.fillna(scores)
+
+    # code -1 (missing comment) maps to the trailing 0
+    values = np.append(known.to_numpy(dtype="float64"), 0.0)
+    return values[codes]
+
+
+def sentiment_label(values):
+    values = np.asarray(values)
+    return np.select([values > 0.2, values < -0.2], ["Positive", "Negative"], default="Neutral")
+
+
+@timed("enrich_sentiment")
 def enrich_sentiment(feedback):
     df = feedback.copy()
-    df["sentiment_val"] = df["comments"].apply(sentiment_score)
-    df["sentiment"] = df["sentiment_val"].apply(
-        lambda x: "Positive" if x > 0.2 else ("Negative" if x < -0.2 else "Neutral")
-    )
+    df["sentiment_val"] = score_comments(df["comments"])
+    df["sentiment"] = sentiment_label(df["sentiment_val"])
     return df
 
 
 def dealer_sentiment(feedback):
-    df = feedback.copy()
-    if df.empty:
+    if feedback.empty:
         return pd.DataFrame(columns=["dealer_id", "sentiment_avg"])
-    return df.groupby("dealer_id")["sentiment_val"].mean().reset_index().rename(columns={"sentiment_val": "sentiment_avg"})
+    return feedback.groupby("dealer_id", observed=True)["sentiment_val"].mean().reset_index().rename(columns={"sentiment_val": "sentiment_avg"})
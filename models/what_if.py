@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from .churn_model import RISK_BINS, RISK_LABELS
+from .health_score import HEALTH_BINS, HEALTH_LABELS, HEALTH_WEIGHTS
+
+COMPONENTS = list(HEALTH_WEIGHTS)
+
+
+def component_matrix(features):
+    """
+    dealer_id array and the dealers × (s, e, c, a) matrix of normalized components,
+    taken from a dealer_features frame. Cache it once per data version.
+    """
+    matrix = np.ascontiguousarray(features[COMPONENTS].to_numpy(dtype="float64"))
+    return features["dealer_id"].to_numpy(), matrix
+
+
+def bucket(values, bins, labels):
+    """
+    pd.cut(values, bins, labels=labels) for sorted bins, via searchsorted.
+    """
+    codes = np.searchsorted(bins, values, side="left") - 1
+    codes[(codes < 0) | (codes >= len(labels)) | np.isnan(values)] = -1
+    return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+
+
+def rescore(dealer_ids, matrix, weights=HEALTH_WEIGHTS, health_bins=HEALTH_BINS, risk_bins=RISK_BINS):
+    """
+    Health score, churn and both buckets under alternative weights and cut points.
+    Only a matrix-vector product and two searchsorted calls; with the defaults it
+    reproduces score_health / churn_from_health.
+    """
+    health = matrix @ np.array([weights[k] for k in COMPONENTS], dtype="float64") * 100
+    churn = 1 - health / 100
+    return pd.DataFrame({
+        "dealer_id": dealer_ids,
+        "health_score": health,
+        "health_bucket": bucket(health, health_bins, HEALTH_LABELS),
+        "churn_prob": churn,
+        "risk_bucket": bucket(churn, risk_bins, RISK_LABELS),
+    })
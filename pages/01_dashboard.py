@@ -1,76 +1,136 @@
 import streamlit as st
 import pandas as pd
 
-from utils.paths import data_path
-from models.health_score import compute_health_score
-from models.churn_model import compute_churn
-from models.sentiment_model import enrich_sentiment, dealer_sentiment
+from utils import perf
+from utils.data_plane import load_artifact, load_data, require_artifacts
+from utils.data_store import data_version
+from utils.perf_panel import fragment_perf, perf_panel
+from utils.session import memo
+from models.churn_model import RISK_BINS
+from models.cube import claims_by_severity, dealer_units, oem_monthly_units
+from models.health_score import HEALTH_BINS, HEALTH_WEIGHTS
+from models.what_if import component_matrix, rescore
 
 st.set_page_config(page_title="🚗 OEM KAM Dashboard", layout="wide")
 
 
-@st.cache_data
-def load_data():
-    dealer = pd.read_csv(data_path("dealer_master.csv"))
-    sales = pd.read_csv(data_path("sales_transactions.csv"))
-    inv = pd.read_csv(data_path("inventory_stock.csv"))
-    claims = pd.read_csv(data_path("warranty_claims.csv"))
-    crm = pd.read_csv(data_path("crm_engagement.csv"))
-    feedback = pd.read_csv(data_path("feedback_forms.csv"))
-    return dealer, sales, inv, claims, crm, feedback
+@st.cache_resource(max_entries=1)
+def load_components(version):
+    return component_matrix(load_artifact("features", version))
+
+
+@st.cache_resource(max_entries=1)
+def load_rollups(version):
+    """
+    OEM monthly units, claims by severity and units per dealer, rolled up from the cube.
+    """
+    cube = load_artifact("cube", version)
+    return oem_monthly_units(cube), claims_by_severity(cube), dealer_units(cube)
+
+
+@st.cache_resource(max_entries=1)
+def load_oem_trend(version):
+    """
+    OEM monthly units followed by the reconciled OEM forecast of the hierarchy.
+    """
+    monthly = load_rollups(version)[0]
+    fc = load_artifact("hierarchy_totals", version)
+    fc = fc[fc["level"] == "oem"]
+    future = pd.DataFrame({"month": pd.to_datetime(fc["month"].astype(str)).to_numpy(),
+                           "forecast": fc["forecast_units"].to_numpy()})
+    trend = monthly.assign(forecast=float("nan"))
+    trend.loc[trend.index[-1:], "forecast"] = trend["units"].iloc[-1:]   # joins the two lines
+    return pd.concat([trend, future], ignore_index=True)
+
+
+WEIGHT_LABELS = {"s": "Sales trend", "e": "Engagement", "c": "Claims", "a": "Inventory age"}
+
+
+def what_if_controls():
+    """
+    What-if weights and bucket cut points; defaults are the production scoring.
+    """
+    with st.expander("🎛 What-if scoring"):
+        cols = st.columns(len(WEIGHT_LABELS))
+        weights = {
+            k: col.slider(label, 0.0, 1.0, HEALTH_WEIGHTS[k], 0.05, key=f"weight_{k}")
+            for col, (k, label) in zip(cols, WEIGHT_LABELS.items())
+        }
+        health_cuts = st.slider("Health bucket cut points", 0, 100, tuple(HEALTH_BINS[1:-1]))
+        risk_cuts = st.slider("Churn risk cut points", 0.0, 1.0, tuple(RISK_BINS[1:-1]), 0.01)
+        st.caption("Weights are rescaled to sum to 1.")
+
+    total = sum(weights.values()) or 1
+    weights = {k: v / total for k, v in weights.items()}
+    return weights, [HEALTH_BINS[0], *health_cuts, HEALTH_BINS[-1]], [RISK_BINS[0], *risk_cuts, RISK_BINS[-1]]
+
+
+def scored_dealers(version, weights, health_bins, risk_bins):
+    """
+    Dealer master + features with health/churn under the what-if scoring.
+    Re-weights the cached component matrix (no aggregate recompute).
+    """
+    (dealer,) = load_data(version, ("dealer",))
+    features = load_artifact("features", version)
+    scenario = rescore(*load_components(version), weights, health_bins, risk_bins)
+    features = features.drop(columns=scenario.columns[1:]).merge(scenario, on="dealer_id")
+    return dealer.merge(features, on="dealer_id", how="left")
+
+
+# ====================
+# HEALTH & CHURN (reruns alone when a what-if control changes)
+# ====================
+
+@st.fragment
+@fragment_perf("health")
+def health_section(version):
+    weights, health_bins, risk_bins = what_if_controls()
+    key = (version, tuple(weights.values()), tuple(health_bins), tuple(risk_bins))
+    df = memo("dashboard.scored", key, lambda: scored_dealers(version, weights, health_bins, risk_bins))
 
-
-def main():
-    st.title("🏢 OEM → Dealership Key Account Management AI Dashboard")
-
-    # Load data
-    dealer, sales, inv, claims, crm, feedback = load_data()
-
-    # Enrich & compute
-    health = compute_health_score(sales, claims, crm, inv)
-    churn = compute_churn(sales, claims, crm, inv)
-    feedback = enrich_sentiment(feedback)
-    sent = dealer_sentiment(feedback)
-
-    df = (
-        dealer
-        .merge(health, on="dealer_id", how="left")
-        .merge(churn, on="dealer_id", how="left")
-        .merge(sent, on="dealer_id", how="left")
-    )
-
-    # ====================
-    # TOP KPIs
-    # ====================
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Active Dealers", len(df))
     col2.metric("Avg Health Score", f"{df.health_score.mean():.1f}")
     col3.metric("⚠️ High Risk Dealers", (df.risk_bucket == "High").sum())
     col4.metric("Avg Sentiment", f"{df.sentiment_avg.mean():.2f}")
 
-    st.divider()
+    st.subheader("🏥 Dealer Health Distribution")
+    st.bar_chart(df.groupby("health_bucket", observed=False)["dealer_id"].count())
 
-    # ====================
-    # BUSINESS TRENDS
-    # ====================
-    st.subheader("📊 Vehicle Sales Trend (Total OEM)")
+    st.caption("Detect how many dealers are at risk vs stable.")
+
+    st.subheader("Dealers Requiring Attention (Health < 45 & High Churn)")
+
+    risk_df = df[(df.health_score < 45) & (df.churn_prob > 0.55)]
+    st.dataframe(risk_df[["dealer_id", "region", "health_score", "risk_bucket", "churn_prob"]], hide_index=True)
+
+    st.caption("These accounts may require visits, marketing push, or service intervention.")
+
+
+def main():
+    st.title("🏢 OEM → Dealership Key Account Management AI Dashboard")
+    perf.reset()
 
-    sales["date"] = pd.to_datetime(sales["date"])
-    monthly = sales.groupby(sales["date"].dt.to_period("M"))["units_sold"].sum().reset_index()
-    monthly.columns = ["month", "units"]
-    st.line_chart(monthly, x="month", y="units")
+    # Load data
+    version = data_version()
+    # Health, churn and sentiment as published by the precompute worker
+    features, _, _ = require_artifacts(version, ("features", "cube", "hierarchy_totals"))
+    (dealer,) = load_data(version, ("dealer",))
+    _, sev, vol = load_rollups(version)
 
-    st.caption("Shows macro OEM demand across all dealers.")
+    health_section(version)
 
     st.divider()
 
     # ====================
-    # HEALTH DISTRIBUTION
+    # BUSINESS TRENDS
     # ====================
-    st.subheader("🏥 Dealer Health Distribution")
-    st.bar_chart(df.groupby("health_bucket")["dealer_id"].count())
+    st.subheader("📊 Vehicle Sales Trend & Forecast (Total OEM)")
 
-    st.caption("Detect how many dealers are at risk vs stable.")
+    st.line_chart(load_oem_trend(version), x="month", y=["units", "forecast"])
+
+    st.caption("Shows macro OEM demand across all dealers. The forecast is reconciled across "
+               "region, state, dealer and model, so it equals the sum of the dealer forecasts.")
 
     st.divider()
 
@@ -79,8 +139,7 @@ def main():
     # ====================
     st.subheader("🛠 Warranty Complaints Severity")
 
-    sev = claims.groupby("severity")["claim_id"].count().reset_index()
-    st.bar_chart(sev, x="severity", y="claim_id")
+    st.bar_chart(sev, x="severity", y="claims")
 
     st.caption("Spikes in severity directly correlate with churn.")
 
@@ -91,7 +150,6 @@ def main():
     # ====================
     st.subheader("⭐️ Top 10 Dealers by Sales Contribution")
 
-    vol = sales.groupby("dealer_id")["units_sold"].sum().reset_index()
     top10 = vol.sort_values("units_sold", ascending=False).head(10)
     st.dataframe(
         top10.merge(dealer[["dealer_id", "city", "region"]], on="dealer_id"),
@@ -100,26 +158,18 @@ def main():
 
     st.divider()
 
-    st.subheader("Dealers Requiring Attention (Health < 45 & High Churn)")
-
-    risk_df = df[(df.health_score < 45) & (df.churn_prob > 0.55)]
-    st.dataframe(risk_df[["dealer_id", "region", "health_score", "risk_bucket", "churn_prob"]], hide_index=True)
-
-    st.caption("These accounts may require visits, marketing push, or service intervention.")
-
-    st.divider()
-
     st.subheader("Dealers with Latent Demand (High Sales + Poor Inventory)")
 
-    latent = (
-        vol.merge(inv.groupby("dealer_id")["ageing_days"].mean().reset_index(), on="dealer_id")
-    )
+    ageing = features[["dealer_id", "age"]].rename(columns={"age": "ageing_days"})
+    latent = vol.merge(ageing, on="dealer_id")
     latent = latent[latent["ageing_days"] > 40].sort_values("units_sold", ascending=False)
 
     st.dataframe(latent.head(10), hide_index=True)
 
     st.caption("These dealers could increase sales if inventory is refreshed / allocated.")
 
+    perf_panel()
+
 
 if __name__ == "__main__":
     main()
@@ -1,64 +1,69 @@
-from utils.paths import data_path
 import streamlit as st
-import pandas as pd
-
-@st.cache_data
-def load_data():
-    dealer = pd.read_csv(data_path("dealer_master.csv"))
-    sales = pd.read_csv(data_path("sales_transactions.csv"))
-    inv = pd.read_csv(data_path("inventory_stock.csv"))
-    claims = pd.read_csv(data_path("warranty_claims.csv"))
-    crm = pd.read_csv(data_path("crm_engagement.csv"))
-    feedback = pd.read_csv(data_path("feedback_forms.csv"))
-    return dealer, sales, inv, claims, crm, feedback
+from utils import perf
+from utils.data_plane import load_artifact, load_data, require_artifacts
+from utils.data_store import data_version
+from utils.dealer_index import DealerIndex, partition_by_dealer
+from utils.perf_panel import perf_panel
+from models.cube import monthly_sales
+
+@st.cache_resource(max_entries=1)
+def load_index(version):
+    claims, crm = load_data(version, ("claims", "crm"))
+    return DealerIndex(crm, claims)
+
+
+@st.cache_resource(max_entries=1)
+def load_monthly(version):
+    """
+    Units per dealer × month rolled up from the cube, partitioned by dealer.
+    """
+    sales = monthly_sales(load_artifact("cube", version))
+    monthly = sales.groupby(["dealer_id", "date"], observed=True)["units_sold"].sum().reset_index()
+    return partition_by_dealer(monthly, "date")
 
-import streamlit as st
-import pandas as pd
-from utils.paths import data_path
-from models.health_score import compute_health_score
-from models.churn_model import compute_churn
-from models.sentiment_model import enrich_sentiment, dealer_sentiment
-
-@st.cache_data
-def load_data():
-    dealer = pd.read_csv(data_path("dealer_master.csv"))
-    sales = pd.read_csv(data_path("sales_transactions.csv"))
-    inv = pd.read_csv(data_path("inventory_stock.csv"))
-    claims = pd.read_csv(data_path("warranty_claims.csv"))
-    crm = pd.read_csv(data_path("crm_engagement.csv"))
-    feedback = pd.read_csv(data_path("feedback_forms.csv"))
-    return dealer, sales, inv, claims, crm, feedback
+
+@st.cache_resource(max_entries=1)
+def load_history(version):
+    return partition_by_dealer(load_artifact("health_history", version), "month")
 
 
 def main():
     st.title("Account Explorer")
+    perf.reset()
 
-    dealer, sales, inv, claims, crm, feedback = load_data()
-    health = compute_health_score(sales, claims, crm, inv)
-    churn = compute_churn(sales, claims, crm, inv)
-
-    f = enrich_sentiment(feedback)
-    s_agg = dealer_sentiment(f)
+    version = data_version()
+    features, _, _ = require_artifacts(version, ("features", "cube", "health_history"))
+    (dealer,) = load_data(version, ("dealer",))
 
-    df = dealer.merge(health, on="dealer_id").merge(churn, on="dealer_id").merge(s_agg, on="dealer_id", how="left")
+    df = dealer.merge(features[features["health_score"].notna()], on="dealer_id")
+    index = load_index(version)
+    monthly, monthly_bounds = load_monthly(version)
+    history, history_bounds = load_history(version)
 
     sel = st.selectbox("Select Dealer", df["dealer_id"])
 
-    d = df[df["dealer_id"] == sel].iloc[0]
+    d = df.set_index("dealer_id").loc[sel]
     st.metric("Health", f"{d.health_score:.1f}")
     st.metric("Churn", f"{d.churn_prob:.2f}")
     st.metric("Sentiment", f"{d.sentiment_avg:.2f}")
 
     st.subheader("Sales Trend")
-    sd = sales[sales["dealer_id"] == sel]
-    sd = sd.groupby("date")["units_sold"].sum().reset_index()
-    st.line_chart(sd, x="date", y="units_sold")
+    start, stop = monthly_bounds.get(sel, (0, 0))
+    st.line_chart(monthly.iloc[start:stop], x="date", y="units_sold")
+
+    st.subheader("Health & Churn Over Time")
+    start, stop = history_bounds.get(sel, (0, 0))
+    trend = history.iloc[start:stop].set_index("month")
+    st.line_chart(trend["health_score"])
+    st.line_chart(trend["churn_prob"])
 
     st.subheader("Recent CRM Touchpoints")
-    st.dataframe(crm[crm["dealer_id"] == sel].sort_values("date", ascending=False).head(20))
+    st.dataframe(index.crm_for(sel).head(20))
 
     st.subheader("Warranty")
-    st.dataframe(claims[claims["dealer_id"] == sel].sort_values("filed_date", ascending=False))
+    st.dataframe(index.claims_for(sel))
+
+    perf_panel()
 
 
 if __name__ == "__main__":
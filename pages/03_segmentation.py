@@ -1,53 +1,53 @@
 import streamlit as st
-import pandas as pd
-from sklearn.cluster import KMeans
-from utils.paths import data_path
-from models.sentiment_model import enrich_sentiment, dealer_sentiment
-
-@st.cache_data
-def load_data():
-    dealer = pd.read_csv(data_path("dealer_master.csv"))
-    sales = pd.read_csv(data_path("sales_transactions.csv"))
-    inv = pd.read_csv(data_path("inventory_stock.csv"))
-    claims = pd.read_csv(data_path("warranty_claims.csv"))
-    crm = pd.read_csv(data_path("crm_engagement.csv"))
-    feedback = pd.read_csv(data_path("feedback_forms.csv"))
-    return dealer, sales, inv, claims, crm, feedback
+from utils import perf
+from utils.data_plane import load_artifact, require_artifacts
+from utils.data_store import data_version
+from utils.perf_panel import fragment_perf, perf_panel
+from models.segmentation import K_RANGE
+
+
+@st.fragment
+@fragment_perf("clusters")
+def cluster_section(version):
+    """
+    Reruns alone when the number of clusters changes: labels for every k are precomputed.
+    """
+    segments = load_artifact("segments", version)
+
+    fitted = [k for k in K_RANGE if f"cluster_{k}" in segments]   # k < dealer count only
+    if not fitted:
+        st.info("Too few dealers to cluster.")
+        return
+    if len(fitted) > 1:
+        k = st.slider("Number of clusters", min(fitted), max(fitted), min(3, max(fitted)))
+    else:
+        k = fitted[0]
+        st.caption(f"Only {k} clusters fit this few dealers.")
+
+    labels = [f"cluster_{kk}" for kk in K_RANGE]
+    df = segments.drop(columns=labels, errors="ignore")
+    df["cluster"] = segments[f"cluster_{k}"]
 
+    st.subheader("Clusters")
+    st.dataframe(df)
 
-def main():
-    st.title("Segmentation")
-
-    dealer, sales, inv, claims, crm, feedback = load_data()
-
-    # Sentiment must be enriched first
-    feedback = enrich_sentiment(feedback)
-    sent = dealer_sentiment(feedback)
-
-    # Aggregate sales volume
-    vol = sales.groupby("dealer_id")["units_sold"].sum().reset_index()
-
-    df = (
-        dealer
-        .merge(vol, on="dealer_id")
-        .merge(sent, on="dealer_id", how="left")
-    )
-
-    df.fillna(0, inplace=True)
+    st.subheader("Visualization")
+    st.scatter_chart(df, x="units_sold", y="sentiment_avg", color="cluster")
 
-    # Choose variables to cluster on
-    X = df[["units_sold", "sentiment_avg"]]
 
-    k = st.slider("Number of clusters", 2, 6, 3)
-    kmeans = KMeans(n_clusters=k, n_init="auto").fit(X)
+def main():
+    st.title("Segmentation")
+    perf.reset()
 
-    df["cluster"] = kmeans.labels_
+    version = data_version()
+    _, quality = require_artifacts(version, ("segments", "segment_quality"))
+    cluster_section(version)
 
-    st.subheader("Clusters")
-    st.dataframe(df)
+    st.subheader("Cluster Quality by k")
+    st.dataframe(quality, hide_index=True)
+    st.caption("Features are standardized; silhouette is sampled for large dealer counts.")
 
-    st.subheader("Visualization")
-    st.scatter_chart(df, x="units_sold", y="sentiment_avg", color="cluster")
+    perf_panel()
 
 
 if __name__ == "__main__":
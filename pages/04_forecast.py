@@ -1,34 +1,54 @@
 import streamlit as st
 import pandas as pd
-from utils.paths import data_path
-from statsmodels.tsa.statespace.sarimax import SARIMAX
-
-
-@st.cache_data
-def load_data():
-    dealer = pd.read_csv(data_path("dealer_master.csv"))
-    sales = pd.read_csv(data_path("sales_transactions.csv"))
-    return dealer, sales
+from utils import perf
+from utils.data_plane import load_artifact, load_data, require_artifacts
+from utils.data_store import data_version
+from utils.dealer_index import partition_by_dealer
+from utils.perf import timed
+from utils.perf_panel import fragment_perf, perf_panel
+from utils.session import memo
+from models.cube import monthly_sales
+from models.forecast_model import FORECAST_COLUMNS, MAX_HORIZON, MIN_HISTORY, fast_forecast, forecast_ts
+from models.hierarchy import ALL
+
+METHODS = {
+    "SARIMAX": "sarimax",
+    "Hierarchical (reconciled)": "hierarchical",
+    "Holt-Winters (fast)": "holt_winters",
+    "Seasonal naive (fast)": "seasonal_naive",
+    "Drift (fast)": "drift",
+}
+
+
+@st.cache_resource(max_entries=1)
+def load_sales(version):
+    """
+    Monthly dealer × model units from the cube, partitioned by dealer.
+    """
+    return partition_by_dealer(monthly_sales(load_artifact("cube", version)), "date")
 
 
-def forecast_ts(series, periods=3):
+@st.cache_resource(max_entries=1)
+def load_hierarchy(version):
     """
-    Train a SARIMA model on past dealer/model sales
+    The reconciled hierarchy partitioned by dealer: a dealer's slice holds its dealer
+    and model rows; the OEM, region and state rows share the ALL slice.
     """
-    model = SARIMAX(
-        series,
-        order=(1,1,1),
-        seasonal_order=(1,1,1,12),  # yearly seasonality
-        enforce_stationarity=False,
-        enforce_invertibility=False,
-    )
-    results = model.fit(disp=False)
-    return results.forecast(periods)
+    return partition_by_dealer(load_artifact("hierarchy_forecast", version), "month")
 
 
-def build_forecast(sales_df, dealer_id, months):
-    dealer_df = sales_df[sales_df["dealer_id"] == dealer_id].copy()
-    dealer_df["date"] = pd.to_datetime(dealer_df["date"])
+def hierarchy_rows(version, dealer_id):
+    table, bounds = load_hierarchy(version)
+    start, stop = bounds.get(dealer_id, (0, 0))
+    return table.iloc[start:stop]
+
+
+@timed("build_forecast")
+def build_forecast(sales_df, dealer_id, months, method="sarimax"):
+    dealer_df = sales_df[sales_df["dealer_id"] == dealer_id]
+
+    if method != "sarimax":
+        return fast_forecast(dealer_df, periods=months, method=method)
 
     results = []
     for model_name in dealer_df["model"].unique():
@@ -39,31 +59,57 @@ def build_forecast(sales_df, dealer_id, months):
             .sum()
         )
 
-        if len(ts) < 6:
+        if len(ts) < MIN_HISTORY:
             continue  # not enough data
 
-        fc = forecast_ts(ts, periods=months)
+        fc = forecast_ts(ts, periods=months, dealer_id=dealer_id, model_name=model_name)
 
         for i, val in enumerate(fc):
             results.append({
                 "dealer_id": dealer_id,
                 "model": model_name,
+                "step": i + 1,
                 "month": (ts.index[-1] + pd.DateOffset(months=i+1)).strftime("%Y-%m"),
                 "forecast_units": float(val)
             })
 
-    return pd.DataFrame(results)
+    return pd.DataFrame(results, columns=FORECAST_COLUMNS)
 
 
-def main():
-    st.title("📈 Forecast & Growth Opportunities")
+def dealer_forecast(version, dealer_id, method):
+    """
+    Full MAX_HORIZON forecast for one dealer: the published batch table for SARIMAX
+    when available, else fitted here; the model level of the reconciled hierarchy
+    for the hierarchical method. The horizon slider only slices it.
+    """
+    if method == "hierarchical":
+        rows = hierarchy_rows(version, dealer_id)
+        rows = rows.loc[rows["level"] == "model", FORECAST_COLUMNS]
+        return rows.astype({"dealer_id": str, "model": str, "month": str})
 
-    dealer_df, sales_df = load_data()
+    table = load_artifact("forecast", version) if method == "sarimax" else None
+    if table is not None:
+        return table[table["dealer_id"] == dealer_id]
 
-    months = st.slider("Months Ahead", 1, 12, 3)
-    dealer_id = st.selectbox("Dealer", dealer_df["dealer_id"])
+    sales, bounds = load_sales(version)
+    start, stop = bounds.get(dealer_id, (0, 0))
+    return build_forecast(sales.iloc[start:stop], dealer_id, MAX_HORIZON, method=method)
 
-    forecast = build_forecast(sales_df, dealer_id, months)
+
+# ====================
+# FORECAST VIEW (reruns alone when the horizon changes)
+# ====================
+
+@st.fragment
+@fragment_perf("forecast")
+def forecast_view(version, dealer_id, method):
+    full = memo("forecast.full", (version, dealer_id, method),
+                lambda: dealer_forecast(version, dealer_id, method))
+    if method == "sarimax" and load_artifact("forecast", version) is None:
+        st.caption("The portfolio forecast is still being precomputed — this dealer was fitted on demand.")
+
+    months = st.slider("Months Ahead", 1, MAX_HORIZON, 3)
+    forecast = full[full["step"] <= months].drop(columns="step")
 
     if forecast.empty:
         st.warning("Not enough historical data to forecast.")
@@ -75,6 +121,49 @@ def main():
     chart_df = forecast.pivot(index="month", columns="model", values="forecast_units")
     st.line_chart(chart_df)
 
+    if method == "hierarchical":
+        hierarchy_totals(version, dealer_id, months)
+
+
+def hierarchy_totals(version, dealer_id, months):
+    """
+    The dealer's totals next to its state, region and OEM: all from one coherent forecast.
+    """
+    rows = hierarchy_rows(version, dealer_id)
+    node = rows[rows["level"] == "dealer"]
+    if node.empty:
+        return
+    region, state = node["region"].iloc[0], node["state"].iloc[0]
+    table = hierarchy_rows(version, ALL)     # OEM, region and state rows only
+    upper = (
+        (table["level"] == "oem")
+        | ((table["level"] == "region") & (table["region"] == region))
+        | ((table["level"] == "state") & (table["region"] == region) & (table["state"] == state))
+    )
+    totals = pd.concat([node, table[upper]])
+    totals = totals[totals["step"] <= months].astype({"level": str, "month": str})
+    st.subheader("Dealer, State, Region & OEM Totals")
+    st.dataframe(
+        totals.pivot(index="month", columns="level", values="forecast_units")[["dealer", "state", "region", "oem"]],
+    )
+    st.caption("Reconciled forecasts add up exactly: model → dealer → state → region → OEM.")
+
+
+def main():
+    st.title("📈 Forecast & Growth Opportunities")
+    perf.reset()
+
+    version = data_version()
+    (dealer_df,) = load_data(version, ("dealer",))
+
+    dealer_id = st.selectbox("Dealer", dealer_df["dealer_id"])
+    method = METHODS[st.selectbox("Method", list(METHODS))]
+    require_artifacts(version, ("hierarchy_forecast",) if method == "hierarchical" else ("cube",))
+
+    forecast_view(version, dealer_id, method)
+
+    perf_panel()
+
 
 if __name__ == "__main__":
     main()
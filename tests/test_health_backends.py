@@ -0,0 +1,47 @@
+"""
+Every health backend must reproduce the pandas health components and scores.
+
+    python -m unittest discover tests
+"""
+import glob
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from models import health_backends
+from models.health_backends import BACKENDS, check_parity
+from utils.paths import data_path
+
+
+class HealthBackendParity(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # a private copy, so the test builds its own snapshot
+        cls.data_dir = tempfile.mkdtemp(prefix="kam-test-")
+        for path in glob.glob(data_path("*.csv")):
+            shutil.copy(path, cls.data_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.data_dir, ignore_errors=True)
+
+    def test_backends_match_pandas(self):
+        for backend in BACKENDS[1:]:
+            with self.subTest(backend=backend):
+                check_parity(self.data_dir, backend=backend)
+
+    def test_mismatch_raises(self):
+        real = health_backends.snapshot_health_components
+
+        def skewed(backend="pandas", data_dir=None):
+            df = real(backend, data_dir)
+            return df.assign(age=df["age"] + 1) if backend == "duckdb" else df
+
+        with mock.patch.object(health_backends, "snapshot_health_components", skewed):
+            with self.assertRaises(AssertionError):
+                check_parity(self.data_dir, backend="duckdb")
+
+
+if __name__ == "__main__":
+    unittest.main()
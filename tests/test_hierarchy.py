@@ -0,0 +1,83 @@
+"""
+The reconciled hierarchy must stay close to recent actuals, and SARIMAX bases are
+only used where there is enough history and the fit looks plausible.
+
+    python -m unittest discover tests
+"""
+import glob
+import shutil
+import tempfile
+import unittest
+import warnings
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from models import hierarchy
+from models.cube import build_cube, monthly_sales
+from models.hierarchy import ALL, RECONCILIATION, SARIMAX_HISTORY, base_forecasts, hierarchy_forecast
+from utils.data_store import load_tables
+from utils.paths import data_path
+
+TOLERANCE = 0.15    # OEM step-1 forecast vs the mean of the last three months
+
+
+class HierarchyForecast(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.data_dir = tempfile.mkdtemp(prefix="kam-test-")
+        for path in glob.glob(data_path("*.csv")):
+            shutil.copy(path, cls.data_dir)
+        dealer, sales, claims, crm = load_tables(("dealer", "sales", "claims", "crm"), data_dir=cls.data_dir)
+        cls.dealer, cls.sales = dealer, monthly_sales(build_cube(sales, claims, crm))
+        totals = cls.sales.groupby(cls.sales["date"].dt.to_period("M"))["units_sold"].sum()
+        cls.recent = totals.iloc[-3:].mean()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.data_dir, ignore_errors=True)
+
+    def forecast(self, method):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return hierarchy_forecast(self.dealer, self.sales, method=method, workers=1, data_dir=self.data_dir)
+
+    def test_oem_forecast_tracks_recent_actuals(self):
+        for method in RECONCILIATION:
+            with self.subTest(method=method):
+                table = self.forecast(method)
+                oem = table.loc[(table["level"] == "oem") & (table["step"] == 1), "forecast_units"].iloc[0]
+                self.assertLess(abs(oem / self.recent - 1), TOLERANCE)
+
+    def test_short_history_uses_holt_winters(self):
+        table = self.forecast("mint")
+        self.assertLess(self.sales["date"].dt.to_period("M").nunique(), SARIMAX_HISTORY)
+        self.assertTrue((table["base"] == "holt_winters").all())
+
+
+class SarimaxSanityCheck(unittest.TestCase):
+    def bases(self, sarimax_level):
+        nodes = pd.DataFrame({"level": ["oem"], "region": [ALL], "state": [ALL], "dealer_id": [ALL], "model": [ALL]})
+        y = np.full((1, SARIMAX_HISTORY + 3), 200.0)
+        months = pd.period_range("2022-01", periods=y.shape[1], freq="M")
+
+        def fitted(tasks, workers=None, data_dir=None):
+            return [(None, None, step, None, sarimax_level) for _ in tasks for step in range(1, 4)]
+
+        with mock.patch.object(hierarchy, "_run_tasks", fitted):
+            return base_forecasts(nodes, y, months, 3, workers=1)
+
+    def test_plausible_fit_is_used(self):
+        fc, base = self.bases(210.0)
+        self.assertEqual(base[0], "sarimax")
+        np.testing.assert_allclose(fc[0], 210.0)
+
+    def test_runaway_fit_falls_back_to_holt_winters(self):
+        fc, base = self.bases(600.0)
+        self.assertEqual(base[0], "holt_winters")
+        np.testing.assert_allclose(fc[0], 200.0, rtol=0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+"""
+Source tables are typed and validated by utils.schema.
+
+    python -m unittest discover tests
+"""
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from utils.schema import SchemaError, apply_schema, read_source
+
+
+class FeedbackSchema(unittest.TestCase):
+    def feedback(self, sentiment):
+        return pd.DataFrame({
+            "dealer_id": ["D001", "D002", "D003"],
+            "feedback_date": ["2024-12-27", "2024-09-10", "2024-10-01"],
+            "feedback_source": ["Ad-hoc Call", "Review Meeting", "Survey"],
+            "sentiment": sentiment,
+            "comments": ["Training for staff is needed.", "Product quality is appreciated.", "Slow parts supply."],
+        })
+
+    def test_sentiment_labels_load(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "feedback_forms.csv")
+            self.feedback(["Positive", "Neutral", "Negative"]).to_csv(path, index=False)
+            df = read_source("feedback", path)
+        self.assertIsInstance(df["sentiment"].dtype, pd.CategoricalDtype)
+        self.assertEqual(df["sentiment"].tolist(), ["Positive", "Neutral", "Negative"])
+
+    def test_sentiment_may_be_empty(self):
+        df = apply_schema("feedback", self.feedback([None, None, None]))
+        self.assertTrue(df["sentiment"].isna().all())
+
+    def test_missing_key_raises(self):
+        df = self.feedback(["Positive", "Neutral", "Negative"])
+        df.loc[1, "dealer_id"] = None
+        with self.assertRaises(SchemaError):
+            apply_schema("feedback", df)
+
+
+if __name__ == "__main__":
+    unittest.main()
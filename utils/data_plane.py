@@ -0,0 +1,90 @@
+import os
+
+import streamlit as st
+
+from .data_store import TABLES, load_tables
+from .perf import span, timed
+
+# the precompute worker runs as a thread inside the Streamlit server unless this is 0
+# (when `python -m models.precompute` runs as its own job)
+IN_APP_WORKER = os.environ.get("KAM_PRECOMPUTE_THREAD", "1") != "0"
+POLL_SECONDS = 2    # how often a "precomputing" placeholder looks for the published tables
+
+
+@st.cache_resource
+def precompute_worker():
+    """
+    Starts the background precompute thread once per server process.
+    """
+    from models.precompute import start_worker
+    return start_worker()
+
+
+@st.cache_resource(max_entries=1)
+def shared_tables(version):
+    """
+    The six snapshot tables for one data version, loaded once per process.
+    Every session and page gets the same frame objects (no pickling or per-rerun copy),
+    so they are read-only: model code must derive new frames instead of assigning columns.
+    """
+    return dict(zip(TABLES, load_tables()))
+
+
+@timed("load_data")
+def load_data(version, names=tuple(TABLES)):
+    """
+    The requested tables (default: dealer, sales, inv, claims, crm, feedback) from the shared plane.
+    """
+    if IN_APP_WORKER:
+        precompute_worker()
+    tables = shared_tables(version)
+    return tuple(tables[name] for name in names)
+
+
+@st.cache_resource(max_entries=8)
+def _artifact(name, version, build):
+    from models.pipeline import artifact
+    df = artifact(name, version, shared_tables(version) if build else None, build=build)
+    if df is None:
+        raise LookupError(name)     # not cached, so the next rerun looks again
+    return df
+
+
+def load_artifact(name, version, build=False):
+    """
+    A derived table published by the precompute worker, shared like the source tables,
+    or None while it is not published yet. build=True builds a missing table on the
+    spot instead; pages never do, so no request pays for a recompute.
+    """
+    if IN_APP_WORKER:
+        precompute_worker()
+    with span(f"load_artifact[{name}]") as frame:
+        try:
+            df = _artifact(name, version, build)
+        except LookupError:
+            df = None
+        frame["rows_out"] = None if df is None else len(df)
+        return df
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def _precomputing(version, names):
+    if all(load_artifact(name, version) is not None for name in names):
+        st.rerun()
+    st.info(f"Precomputing {', '.join(names)} for the latest data… this page refreshes when ready.")
+    if not IN_APP_WORKER:
+        st.caption("The in-app worker is off (KAM_PRECOMPUTE_THREAD=0): run `python -m models.precompute`.")
+
+
+def require_artifacts(version, names):
+    """
+    The derived tables `names`, loaded. While any is unpublished, shows a placeholder
+    that reruns the page once the worker has published them, and ends this rerun.
+    Call it before the page's cached loaders, which then always find their tables.
+    """
+    tables = [load_artifact(name, version) for name in names]
+    missing = tuple(name for name, df in zip(names, tables) if df is None)
+    if missing:
+        _precomputing(version, missing)
+        st.stop()
+    return tables
@@ -0,0 +1,191 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+
+import pyarrow.feather as feather
+
+from utils.paths import data_path
+from utils.schema import SCHEMA_VERSION, conform, key_columns, read_source, shared_categories
+
+SNAPSHOT_DIR = ".snapshot"
+MANIFEST = "manifest.json"
+
+# table name -> source csv; column types are in utils.schema.SCHEMA
+TABLES = {
+    "dealer": "dealer_master.csv",
+    "sales": "sales_transactions.csv",
+    "inv": "inventory_stock.csv",
+    "claims": "warranty_claims.csv",
+    "crm": "crm_engagement.csv",
+    "feedback": "feedback_forms.csv",
+}
+
+
+def source_path(filename, data_dir=None):
+    if data_dir is None:
+        return data_path(filename)
+    return os.path.join(data_dir, filename)
+
+
+def snapshot_dir(data_dir=None):
+    """
+    Folder holding the Feather snapshot next to the source CSVs.
+    """
+    base = data_dir if data_dir is not None else os.path.dirname(data_path(""))
+    return os.path.join(base, SNAPSHOT_DIR)
+
+
+def _file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _read_manifest(folder):
+    path = os.path.join(folder, MANIFEST)
+    if not os.path.exists(path):
+        return {"tables": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_atomic(path, write):
+    """
+    Calls write(tmp) on a temporary path next to `path`, then renames it into place,
+    so readers see the old file or the complete new one.
+    """
+    # unique per writer: the precompute worker and page threads may publish the same file
+    tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def dump_json(obj, path):
+    with open(path, "w") as f:
+        json.dump(obj, f, indent=2)
+
+
+def _write_feather(path, df):
+    # uncompressed so the file can be memory-mapped on read
+    write_atomic(path, lambda p: feather.write_feather(df, p, compression="uncompressed"))
+
+
+def _convert(name, src, dest):
+    _write_feather(dest, read_source(name, src))
+
+
+def _share_keys(folder):
+    """
+    Recodes the key columns of every snapshot table to one shared category list
+    (rewriting only tables whose categories differ), so merges and groupbys across
+    tables compare integer codes.
+    """
+    paths = {name: os.path.join(folder, f"{name}.feather") for name in TABLES}
+    keys = {
+        name: feather.read_table(path, columns=key_columns(name)).to_pandas()
+        for name, path in paths.items()
+    }
+    shared = shared_categories(keys)
+    for name, path in paths.items():
+        if conform(name, keys[name], shared) is not keys[name]:
+            _write_feather(path, conform(name, feather.read_table(path).to_pandas(), shared))
+
+
+def refresh_snapshot(data_dir=None):
+    """
+    Rebuild the snapshot of every table whose CSV changed and return the manifest.
+    A changed mtime/size triggers a content hash; only a different hash rebuilds.
+    A snapshot written under another SCHEMA_VERSION is rebuilt entirely.
+    Raises utils.schema.SchemaError if a changed CSV does not match the schema.
+    """
+    folder = snapshot_dir(data_dir)
+    os.makedirs(folder, exist_ok=True)
+    manifest = _read_manifest(folder)
+    if manifest.get("schema") != SCHEMA_VERSION:
+        manifest = {"tables": {}, "schema": SCHEMA_VERSION}
+    entries = manifest["tables"]
+    dirty = False
+
+    for name, filename in TABLES.items():
+        src = source_path(filename, data_dir)
+        dest = os.path.join(folder, f"{name}.feather")
+        st = os.stat(src)
+        entry = entries.get(name, {})
+        if (entry.get("mtime_ns") == st.st_mtime_ns and entry.get("size") == st.st_size
+                and os.path.exists(dest)):
+            continue
+
+        digest = _file_hash(src)
+        if entry.get("sha256") != digest or not os.path.exists(dest):
+            _convert(name, src, dest)
+        entries[name] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": digest}
+        dirty = True
+
+    if dirty or "version" not in manifest:
+        _share_keys(folder)
+        joined = f"schema{SCHEMA_VERSION}" + "".join(entries[name]["sha256"] for name in TABLES)
+        manifest["version"] = hashlib.sha256(joined.encode()).hexdigest()[:16]
+        write_atomic(os.path.join(folder, MANIFEST), lambda p: dump_json(manifest, p))
+    return manifest
+
+
+def data_version(data_dir=None):
+    """
+    Content hash of the source CSVs and the schema version; changes whenever any
+    input file or column type changes.
+    """
+    return refresh_snapshot(data_dir)["version"]
+
+
+def load_tables(names=tuple(TABLES), data_dir=None):
+    """
+    Returns the requested tables (default: dealer, sales, inv, claims, crm, feedback)
+    read from the memory-mapped snapshot, typed as in utils.schema: shared categorical
+    keys, downcast numerics and parsed dates.
+    """
+    refresh_snapshot(data_dir)
+    folder = snapshot_dir(data_dir)
+    return tuple(
+        feather.read_table(os.path.join(folder, f"{name}.feather"), memory_map=True).to_pandas()
+        for name in names
+    )
+
+
+def _derived_path(name, version, data_dir=None):
+    return os.path.join(snapshot_dir(data_dir), "derived", f"{name}-{version}.feather")
+
+
+def save_derived(name, df, version, data_dir=None):
+    """
+    Stores a table computed from the snapshot (e.g. forecasts) under the data version.
+    """
+    path = _derived_path(name, version, data_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_atomic(path, lambda p: feather.write_feather(df, p, compression="uncompressed"))
+    return path
+
+
+def load_derived(name, version, data_dir=None):
+    """
+    Reads a table saved by save_derived for this data version, or None if it was not built.
+    """
+    path = _derived_path(name, version, data_dir)
+    if not os.path.exists(path):
+        return None
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+
+def prune_derived(version, data_dir=None):
+    """
+    Deletes derived tables built for any other data version.
+    """
+    removed = 0
+    for path in glob.glob(os.path.join(snapshot_dir(data_dir), "derived", "*.feather")):
+        if not path.endswith(f"-{version}.feather"):
+            os.remove(path)
+            removed += 1
+    return removed
@@ -0,0 +1,38 @@
+import numpy as np
+
+
+def partition_by_dealer(df, date_col, ascending=True):
+    """
+    Sorts rows by dealer_id then date and returns (frame, {dealer_id: (start, stop)}).
+    """
+    df = df.sort_values(["dealer_id", date_col], ascending=[True, ascending], kind="stable")
+    df = df.reset_index(drop=True)
+    ids = df["dealer_id"].to_numpy()
+    if len(ids) == 0:
+        return df, {}
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    stops = np.r_[starts[1:], len(ids)]
+    return df, {ids[s]: (s, e) for s, e in zip(starts, stops)}
+
+
+class DealerIndex:
+    """
+    CRM and claims physically grouped by dealer_id and pre-sorted newest first, as
+    the Account Explorer shows them, so one dealer's rows are a slice lookup instead
+    of a scan of the portfolio. Sales roll-ups come from the cube (models.cube).
+    """
+
+    def __init__(self, crm, claims):
+        self.crm, self._crm = partition_by_dealer(crm, "date", ascending=False)
+        self.claims, self._claims = partition_by_dealer(claims, "filed_date", ascending=False)
+
+    @staticmethod
+    def _slice(df, bounds, dealer_id):
+        start, stop = bounds.get(dealer_id, (0, 0))
+        return df.iloc[start:stop]
+
+    def crm_for(self, dealer_id):
+        return self._slice(self.crm, self._crm, dealer_id)
+
+    def claims_for(self, dealer_id):
+        return self._slice(self.claims, self._claims, dealer_id)
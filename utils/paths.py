@@ -1,9 +1,20 @@
 import os
 
+
+def data_dir():
+    """
+    Folder with the input CSVs: $KAM_DATA_DIR if set, else the repo's /data folder.
+    """
+    override = os.environ.get("KAM_DATA_DIR")
+    if override:
+        return override
+    base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base, "data")
+
+
 def data_path(filename: str):
     """
     Returns absolute path to CSV files in /data folder.
     Works both locally and on Streamlit Cloud.
     """
-    base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    return os.path.join(base, "data", filename)
+    return os.path.join(data_dir(), filename)
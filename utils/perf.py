@@ -0,0 +1,159 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+# KAM_PERF=1 records wall time and rows; KAM_PERF=memory also the peak allocation
+# (tracemalloc, which slows allocation-heavy code). tracemalloc is process-wide: its
+# peak counts every thread, so with concurrent sessions a span's peak_mb includes
+# their allocations too. KAM_PERF_LOG=<path> appends every record as a JSON line. Unset, instrumented calls go straight through.
+_MODE = os.environ.get("KAM_PERF", "0").lower()
+_ENABLED = _MODE not in ("", "0", "false", "off")
+_LOG_PATH = os.environ.get("KAM_PERF_LOG")
+
+# records kept per thread: fragment reruns add to them without a page-level reset
+MAX_RECORDS = 10_000
+
+_local = threading.local()
+_log_lock = threading.Lock()
+_NULL = nullcontext({})
+
+
+def enable(memory=False, log_path=None):
+    global _ENABLED, _LOG_PATH
+    _ENABLED = True
+    _LOG_PATH = log_path or _LOG_PATH
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    global _ENABLED
+    _ENABLED = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def enabled():
+    return _ENABLED
+
+
+if _ENABLED and _MODE == "memory":
+    enable(memory=True)
+
+
+# ===================
+# RECORDS
+# ===================
+
+def _state():
+    if not hasattr(_local, "records"):
+        _local.records, _local.stack = [], []
+    return _local
+
+
+def reset():
+    """
+    Clears and returns this thread's records (one Streamlit session rerun runs in one thread).
+    """
+    state = _state()
+    records, state.records = state.records, []
+    return records
+
+
+def records():
+    return list(_state().records)
+
+
+def take(start):
+    """
+    Removes and returns this thread's records from index `start` on.
+    """
+    state = _state()
+    taken = state.records[start:]
+    del state.records[start:]
+    return taken
+
+
+def _write(record):
+    with _log_lock, open(_LOG_PATH, "a") as f:
+        f.write(json.dumps(record, default=str) + "\n")
+
+
+def _rows(obj):
+    if isinstance(obj, tuple):
+        counts = [_rows(o) for o in obj]
+        return sum(c for c in counts if c is not None) if any(c is not None for c in counts) else None
+    return len(obj) if hasattr(obj, "columns") or hasattr(obj, "dtype") else None
+
+
+# ===================
+# SPAN / DECORATOR
+# ===================
+
+@contextmanager
+def _span(name, rows_in):
+    state = _state()
+    tracing = tracemalloc.is_tracing()
+    frame = {"name": name, "rows_in": rows_in, "rows_out": None, "peak": 0, "base": 0}
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if state.stack:     # keep the enclosing span's peak before resetting it
+            state.stack[-1]["peak"] = max(state.stack[-1]["peak"], peak)
+        tracemalloc.reset_peak()
+        frame["base"] = current
+    state.stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield frame
+    finally:
+        seconds = time.perf_counter() - start
+        state.stack.pop()
+        record = {
+            "ts": time.time(), "name": name, "seconds": round(seconds, 6),
+            "rows_in": frame["rows_in"], "rows_out": frame["rows_out"],
+            "depth": len(state.stack), "pid": os.getpid(), "thread": threading.get_ident(),
+        }
+        if tracing:
+            peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+            if state.stack:
+                state.stack[-1]["peak"] = max(state.stack[-1]["peak"], peak)
+            record["peak_mb"] = round((peak - frame["base"]) / 2**20, 3)
+        state.records.append(record)
+        if len(state.records) > MAX_RECORDS:
+            del state.records[:-MAX_RECORDS]
+        if _LOG_PATH:
+            _write(record)
+
+
+def span(name, rows_in=None):
+    """
+    Context manager timing a block; set `frame["rows_out"]` on the yielded dict if known.
+    A no-op (shared nullcontext) while instrumentation is disabled.
+    """
+    if not _ENABLED:
+        return _NULL
+    return _span(name, rows_in)
+
+
+def timed(name=None):
+    """
+    Decorator recording each call's wall time, rows in (DataFrame/Series arguments),
+    rows out and peak allocation. Disabled, it adds one flag check per call.
+    """
+    def decorate(fn):
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return fn(*args, **kwargs)
+            with _span(label, _rows(args + tuple(kwargs.values()))) as frame:
+                result = fn(*args, **kwargs)
+                frame["rows_out"] = _rows(result)
+                return result
+        return wrapper
+    return decorate
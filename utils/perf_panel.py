@@ -0,0 +1,56 @@
+import functools
+
+import pandas as pd
+import streamlit as st
+
+from . import perf
+
+
+def _render(records, empty):
+    if not records:
+        st.caption(empty)
+        return
+    df = pd.DataFrame(records)
+    df["call"] = ["  " * d + n for d, n in zip(df["depth"], df["name"])]
+    df = df.rename(columns={"peak_mb": "process_peak_mb"})
+    cols = [c for c in ["call", "seconds", "rows_in", "rows_out", "process_peak_mb"] if c in df]
+    st.dataframe(df[cols], hide_index=True)
+    top = df["depth"] == df["depth"].min()
+    note = " · peak memory is process-wide (includes concurrent sessions)" if "process_peak_mb" in df else ""
+    st.caption(f"{df.loc[top, 'seconds'].sum():.3f}s in top-level calls{note}")
+
+
+def perf_panel():
+    """
+    Collapsible sidebar breakdown of the instrumented calls of this rerun.
+    Renders nothing unless instrumentation is enabled (KAM_PERF).
+    Call perf.reset() at the top of the page so only this rerun is shown.
+    """
+    if not perf.enabled():
+        return
+    records = perf.reset()
+    with st.sidebar.expander("⏱ Performance"):
+        _render(records, "No instrumented calls in this rerun (all served from cache).")
+
+
+def fragment_perf(name):
+    """
+    Decorator for an st.fragment body (applied under @st.fragment). A fragment rerun
+    never reaches the page's sidebar panel, and fragments cannot write to the sidebar,
+    so its calls are shown in an expander at the end of the fragment instead; on a
+    full rerun they collapse to one fragment[name] row in the sidebar panel.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not perf.enabled():
+                return fn(*args, **kwargs)
+            start = len(perf.records())
+            with perf.span(f"fragment[{name}]"):
+                result = fn(*args, **kwargs)
+                calls = perf.take(start)
+            with st.expander(f"⏱ Performance: {name}"):
+                _render(calls, "No instrumented calls in this section (all served from cache).")
+            return result
+        return wrapper
+    return decorate
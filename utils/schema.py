@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+# bump when a dtype below changes: it is part of the data version, so the snapshot
+# and every derived table are rebuilt
+SCHEMA_VERSION = 2
+
+# column -> kind, per table:
+#   "key"       categorical shared by every table (same categories, so merges and
+#               groupbys on it compare integer codes, not strings)
+#   "category"  categorical for this table only
+#   "text"      free text, kept as Python strings
+#   "date"      datetime64, parsed at load
+#   numpy dtype the column is downcast to; values outside its range are rejected
+SCHEMA = {
+    "dealer": {
+        "dealer_id": "key", "dealer_name": "text", "region": "category", "state": "category",
+        "city": "category", "tier": "category", "years_partnered": "int8", "ownership_type": "category",
+    },
+    "sales": {
+        "date": "date", "dealer_id": "key", "model": "key",
+        "units_sold": "int16", "wholesale_value": "float64",
+    },
+    "inv": {
+        "dealer_id": "key", "model": "key", "stock_units": "int32", "ageing_days": "int16",
+    },
+    "claims": {
+        "dealer_id": "key", "claim_id": "text", "model": "key", "issue_type": "category",
+        "severity": "int8", "filed_date": "date", "resolution_days": "int16",
+    },
+    "crm": {
+        "dealer_id": "key", "date": "date", "interaction_type": "category",
+        "notes": "category", "duration_mins": "int16",
+    },
+    "feedback": {
+        "dealer_id": "key", "feedback_date": "date", "feedback_source": "category",
+        "sentiment": "category", "comments": "category",   # sentiment: Positive/Neutral/Negative label
+    },
+}
+
+KEYS = ("dealer_id", "model")
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def key_columns(name):
+    return [col for col, kind in SCHEMA[name].items() if kind == "key"]
+
+
+def date_columns(name):
+    return [col for col, kind in SCHEMA[name].items() if kind == "date"]
+
+
+def _cast(name, col, values, kind):
+    if kind == "key" and values.isna().any():
+        raise SchemaError(f"{name}.{col}: {values.isna().sum()} missing keys")
+    if kind in ("key", "category"):
+        return values.astype("category")
+    if kind == "text":
+        return values.astype(object)
+    if kind == "date":
+        try:
+            return pd.to_datetime(values)
+        except (ValueError, TypeError) as e:
+            raise SchemaError(f"{name}.{col}: unparseable date ({e})") from None
+
+    dtype = np.dtype(kind)
+    try:
+        numbers = pd.to_numeric(values)
+    except (ValueError, TypeError) as e:
+        raise SchemaError(f"{name}.{col}: not numeric ({e})") from None
+    if dtype.kind == "f":
+        return numbers.astype(dtype)
+    if numbers.isna().any():
+        raise SchemaError(f"{name}.{col}: {numbers.isna().sum()} missing values in an integer column")
+    info = np.iinfo(dtype)
+    if len(numbers) and (numbers.min() < info.min or numbers.max() > info.max):
+        raise SchemaError(f"{name}.{col}: values {numbers.min()}..{numbers.max()} do not fit {dtype}")
+    if (numbers != np.round(numbers)).any():
+        raise SchemaError(f"{name}.{col}: fractional values in an integer column")
+    return numbers.astype(dtype)
+
+
+def apply_schema(name, df):
+    """
+    Validates a freshly read source table against SCHEMA[name] and returns it typed:
+    declared columns in schema order (extra columns are dropped), keys and
+    low-cardinality strings as categoricals, numerics downcast, dates parsed.
+    Raises SchemaError naming the table and column on missing columns or bad values.
+    """
+    columns = SCHEMA[name]
+    missing = [col for col in columns if col not in df]
+    if missing:
+        raise SchemaError(f"{name}: missing columns {', '.join(missing)}")
+    return pd.DataFrame({col: _cast(name, col, df[col], kind) for col, kind in columns.items()})
+
+
+def read_source(name, path):
+    """
+    Reads a source CSV (string columns as str, not type-guessed) and applies the schema.
+    """
+    text = [col for col, kind in SCHEMA[name].items() if kind in ("key", "category", "text")]
+    return apply_schema(name, pd.read_csv(path, dtype=dict.fromkeys(text, str)))
+
+
+def shared_categories(frames):
+    """
+    {key: sorted union of its categories across frames ({table: DataFrame})}.
+    """
+    shared = {}
+    for name, df in frames.items():
+        for key in key_columns(name):
+            shared.setdefault(key, set()).update(df[key].cat.categories)
+    return {key: sorted(values) for key, values in shared.items()}
+
+
+def conform(name, df, categories):
+    """
+    The table with its key columns recoded to the shared `categories`; the same
+    frame if they already match.
+    """
+    stale = [key for key in key_columns(name) if list(df[key].cat.categories) != categories[key]]
+    if not stale:
+        return df
+    return df.assign(**{key: df[key].cat.set_categories(categories[key]) for key in stale})
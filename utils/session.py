@@ -0,0 +1,14 @@
+import streamlit as st
+
+
+def memo(name, key, compute):
+    """
+    Per-session intermediate result: returns st.session_state[name] if it was computed
+    for the same `key` (e.g. data version + widget values), else runs compute() and stores it.
+    Lets a fragment rerun reuse what other sections computed, and vice versa.
+    """
+    slot = st.session_state.get(name)
+    if slot is None or slot[0] != key:
+        slot = (key, compute())
+        st.session_state[name] = slot
+    return slot[1]